@@ -12,7 +12,7 @@ env | grep -E 'DJANGO_|DB_|ALLOWED_HOSTS'
 echo "Starting Django..."
 
 if [ "$#" -eq 0 ]; then
-  exec python manage.py runserver 0.0.0.0:8000
+  exec uvicorn src.asgi:application --host 0.0.0.0 --port 8000
 else
   exec "$@"
 fi
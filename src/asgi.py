@@ -0,0 +1,16 @@
+import os
+import sys
+
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+from django.core.asgi import get_asgi_application
+
+# Застосунки імпортуються без префікса src (як у manage.py), тож каталог src додається до шляху імпорту.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'src.settings')
+
+application = get_asgi_application()
+
+# Під uvicorn статичні файли (admin, swagger) у DEBUG роздаються так само, як це робив runserver.
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
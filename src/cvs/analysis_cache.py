@@ -0,0 +1,115 @@
+import hashlib
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
+from django.utils import timezone
+
+from src.openapi.prompts import CV_ANALYSIS_PROMPT
+from .models import CVAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+CV_ANALYSIS_CACHE_ALIAS = getattr(settings, 'CV_ANALYSIS_CACHE_ALIAS', 'cv_analysis')
+CV_ANALYSIS_CACHE_TTL = getattr(settings, 'CV_ANALYSIS_CACHE_TTL', 30 * 24 * 3600)
+# Після скількох звернень до кешу в журнал пишеться зведення влучань і промахів процесу.
+CV_ANALYSIS_CACHE_STATS_EVERY = getattr(settings, 'CV_ANALYSIS_CACHE_STATS_EVERY', 100)
+
+# Версія змінюється разом із текстом промпту, тож після його правок старі результати не повертаються.
+CV_ANALYSIS_PROMPT_VERSION = hashlib.sha256(CV_ANALYSIS_PROMPT.encode('utf-8')).hexdigest()[:16]
+
+
+# Два рівні: LocMemCache процесу (LRU, див. CACHES) і таблиця CVAnalysisResult, спільна для всіх процесів.
+# Ключ - SHA-256 видобутого тексту, версія промпту та модель; записи старші за ttl не повертаються,
+# а з таблиці їх видаляє команда purge_cv_analysis_cache.
+class CVAnalysisCache:
+    def __init__(self, alias=CV_ANALYSIS_CACHE_ALIAS, ttl=CV_ANALYSIS_CACHE_TTL,
+                 stats_every=CV_ANALYSIS_CACHE_STATS_EVERY):
+        self.alias = alias
+        self.ttl = ttl
+        self.stats_every = stats_every
+        self.counters = {'memory_hits': 0, 'db_hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(text, model_name):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest(), CV_ANALYSIS_PROMPT_VERSION, model_name
+
+    @staticmethod
+    def _memory_key(key):
+        return 'cv_analysis:' + ':'.join(key)
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+            stats = dict(self.counters)
+        lookups = sum(stats.values())
+        if self.stats_every and lookups % self.stats_every == 0:
+            hits = stats['memory_hits'] + stats['db_hits']
+            logger.info(f"Кеш аналізу CV: {lookups} звернень, влучань у пам'ять {stats['memory_hits']}, "
+                        f"у БД {stats['db_hits']}, промахів {stats['misses']} (частка влучань {hits / lookups:.0%}).")
+
+    def _memory_timeout(self, memory, seconds):
+        return seconds if memory.default_timeout is None else min(seconds, memory.default_timeout)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def get(self, text, model_name):
+        key = self.key_for(text, model_name)
+        memory = caches[self.alias]
+        content = memory.get(self._memory_key(key))
+        if content is not None:
+            self._count('memory_hits')
+            logger.info(f"Результат аналізу CV {key[0][:12]} знайдено в кеші процесу.")
+            return content
+
+        text_sha256, prompt_version, model_name = key
+        try:
+            row = CVAnalysisResult.objects.filter(
+                text_sha256=text_sha256, prompt_version=prompt_version, model_name=model_name,
+                expires_at__gt=timezone.now(),
+            ).values_list('content', 'expires_at').first()
+        except DatabaseError as e:
+            logger.warning(f"Не вдалося прочитати кеш аналізу CV з БД: {e}")
+            row = None
+
+        if row is None:
+            self._count('misses')
+            return None
+
+        content, expires_at = row
+        remaining = int((expires_at - timezone.now()).total_seconds())
+        memory.set(self._memory_key(key), content, timeout=self._memory_timeout(memory, max(1, remaining)))
+        self._count('db_hits')
+        logger.info(f"Результат аналізу CV {text_sha256[:12]} знайдено в БД.")
+        return content
+
+    def set(self, text, model_name, content):
+        key = self.key_for(text, model_name)
+        text_sha256, prompt_version, model_name = key
+        now = timezone.now()
+        try:
+            CVAnalysisResult.objects.update_or_create(
+                text_sha256=text_sha256, prompt_version=prompt_version, model_name=model_name,
+                defaults={'content': content, 'expires_at': now + timedelta(seconds=self.ttl)},
+            )
+        except DatabaseError as e:
+            logger.warning(f"Не вдалося зберегти результат аналізу CV у БД: {e}")
+        memory = caches[self.alias]
+        memory.set(self._memory_key(key), content, timeout=self._memory_timeout(memory, self.ttl))
+
+    def purge_expired(self):
+        deleted, _ = CVAnalysisResult.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+    def clear(self):
+        caches[self.alias].clear()
+        CVAnalysisResult.objects.all().delete()
+
+
+cv_analysis_cache = CVAnalysisCache()
@@ -2,8 +2,11 @@ import os
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from rest_framework import serializers
 
+from matching.models import CVCatalogGeneration
+
 from ..models import CV, WorkExperience, Education, Course, Skill, Language, Personal, Address, WorkOptions
 from ..service import logger
 
@@ -51,13 +54,15 @@ class PersonalSerializer(serializers.ModelSerializer):
 
 
 class WorkExperienceSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(required=False)
+
     class Meta:
         model = WorkExperience
         fields = [
             'id', 'position', 'company', 'start_date', 'end_date',
             'is_current', 'responsibilities', 'order_index'
         ]
-        read_only_fields = ['id', 'is_current']
+        read_only_fields = ['is_current']
 
     def validate(self, data):
         start_date = data.get('start_date')
@@ -68,13 +73,14 @@ class WorkExperienceSerializer(serializers.ModelSerializer):
 
 
 class EducationSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(required=False)
+
     class Meta:
         model = Education
         fields = [
             'id', 'major', 'institution', 'start_date', 'end_date',
             'description', 'order_index'
         ]
-        read_only_fields = ['id']
 
     def validate(self, data):
         start_date = data.get('start_date')
@@ -85,13 +91,14 @@ class EducationSerializer(serializers.ModelSerializer):
 
 
 class CourseSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(required=False)
+
     class Meta:
         model = Course
         fields = [
             'id', 'name', 'provider', 'start_date', 'end_date',
             'description', 'order_index'
         ]
-        read_only_fields = ['id']
 
     def validate(self, data):
         start_date = data.get('start_date')
@@ -102,17 +109,68 @@ class CourseSerializer(serializers.ModelSerializer):
 
 
 class SkillSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(required=False)
+
     class Meta:
         model = Skill
         fields = ['id', 'name', 'description', 'level', 'order_index']
-        read_only_fields = ['id']
 
 
 class LanguageSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(required=False)
+
     class Meta:
         model = Language
         fields = ['id', 'name', 'level', 'description', 'order_index']
-        read_only_fields = ['id']
+
+
+# bulk_create/bulk_update не викликають Model.save(), тож похідні поля виставляються тут.
+def _prepare_child(obj):
+    if isinstance(obj, WorkExperience):
+        obj.is_current = obj.end_date is None
+
+
+def _create_children(cv, model, items):
+    objs = []
+    for data in items:
+        data = {k: v for k, v in data.items() if k != 'id'}
+        obj = model(cv=cv, **data)
+        _prepare_child(obj)
+        objs.append(obj)
+    if objs:
+        model.objects.bulk_create(objs)
+
+
+# Порівнює вкладені записи з наявними за id: незмінені не чіпає, змінені оновлює одним bulk_update,
+# нові створює одним bulk_create, відсутні в запиті видаляє. Чужі або невідомі id вважаються новими записами.
+def _sync_children(cv, related_name, model, items):
+    existing = {obj.id: obj for obj in getattr(cv, related_name).all()}
+    to_create, to_update, changed_fields, kept = [], [], set(), set()
+
+    for data in items:
+        data = dict(data)
+        obj = existing.get(data.pop('id', None))
+        if obj is None:
+            to_create.append(data)
+            continue
+        kept.add(obj.id)
+        changed = {field for field, value in data.items() if getattr(obj, field) != value}
+        for field in changed:
+            setattr(obj, field, data[field])
+        was_current = getattr(obj, 'is_current', None)
+        _prepare_child(obj)
+        if getattr(obj, 'is_current', None) != was_current:
+            changed.add('is_current')
+        if changed:
+            to_update.append(obj)
+            changed_fields.update(changed)
+
+    removed = [pk for pk in existing if pk not in kept]
+    if removed:
+        model.objects.filter(pk__in=removed).delete()
+    if to_update:
+        model.objects.bulk_update(to_update, sorted(changed_fields))
+    _create_children(cv, model, to_create)
 
 
 class CVSerializer(serializers.ModelSerializer):
@@ -151,6 +209,7 @@ class CVSerializer(serializers.ModelSerializer):
             'salary_currency': obj.salary_currency,
         }
 
+    @transaction.atomic
     def create(self, validated_data):
         work_experiences_data = validated_data.pop('work_experiences', [])
         educations_data = validated_data.pop('educations', [])
@@ -178,19 +237,16 @@ class CVSerializer(serializers.ModelSerializer):
 
         cv = CV.objects.create(**validated_data)
 
-        for exp_data in work_experiences_data:
-            WorkExperience.objects.create(cv=cv, **exp_data)
-        for edu_data in educations_data:
-            Education.objects.create(cv=cv, **edu_data)
-        for course_data in courses_data:
-            Course.objects.create(cv=cv, **course_data)
-        for skill_data in skills_data:
-            Skill.objects.create(cv=cv, **skill_data)
-        for lang_data in languages_data:
-            Language.objects.create(cv=cv, **lang_data)
+        _create_children(cv, WorkExperience, work_experiences_data)
+        _create_children(cv, Education, educations_data)
+        _create_children(cv, Course, courses_data)
+        _create_children(cv, Skill, skills_data)
+        _create_children(cv, Language, languages_data)
 
+        CVCatalogGeneration.bump()
         return cv
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         work_experiences_data = validated_data.pop('work_experiences', None)
         educations_data = validated_data.pop('educations', None)
@@ -232,30 +288,17 @@ class CVSerializer(serializers.ModelSerializer):
         instance.save()
 
         if work_experiences_data is not None:
-            instance.work_experiences.all().delete()
-            for exp_data in work_experiences_data:
-                WorkExperience.objects.create(cv=instance, **exp_data)
-
+            _sync_children(instance, 'work_experiences', WorkExperience, work_experiences_data)
         if educations_data is not None:
-            instance.educations.all().delete()
-            for edu_data in educations_data:
-                Education.objects.create(cv=instance, **edu_data)
-
+            _sync_children(instance, 'educations', Education, educations_data)
         if courses_data is not None:
-            instance.courses.all().delete()
-            for course_data in courses_data:
-                Course.objects.create(cv=instance, **course_data)
-
+            _sync_children(instance, 'courses', Course, courses_data)
         if skills_data is not None:
-            instance.skills.all().delete()
-            for skill_data in skills_data:
-                Skill.objects.create(cv=instance, **skill_data)
-
+            _sync_children(instance, 'skills', Skill, skills_data)
         if languages_data is not None:
-            instance.languages.all().delete()
-            for lang_data in languages_data:
-                Language.objects.create(cv=instance, **lang_data)
+            _sync_children(instance, 'languages', Language, languages_data)
 
+        CVCatalogGeneration.bump()
         return instance
 
     def validate_position_target(self, value):
@@ -300,7 +343,8 @@ class CVGenerationSerializer(serializers.Serializer):
 
 
 class DownloadCVRequestSerializer(serializers.Serializer):
-    cv_id = serializers.UUIDField(required=True)
+    user_id = serializers.IntegerField(required=True)
+    filename = serializers.CharField(required=True, max_length=255)
 
 
 class ExtractTextFromCVRequestSerializer(serializers.Serializer):
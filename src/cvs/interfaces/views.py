@@ -1,12 +1,15 @@
+import asyncio
 import io
 import logging
 import os
-import time
 import uuid
 from os.path import basename
 
 import google.generativeai as genai
 from django.core.cache import cache
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Q
 from django.utils.decorators import method_decorator
 from django_ratelimit.decorators import ratelimit
 from dotenv import load_dotenv
@@ -21,13 +24,21 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from jobs.interfaces.serializers import JobAcceptedSerializer
+from jobs.interfaces.views import job_accepted_response
+from matching.models import CVCatalogGeneration, Match
+from shared.async_views import AsyncAPIView
+from shared.pagination import CVCursorPagination, StreamingListMixin
 
+from src.openapi.gateway import ai_gateway
 from src.schemas.cvs import (CV_LIST_RESPONSE, CV_CREATE, CV_DETAIL_RESPONSE, CV_DELETE_RESPONSE, CV_BY_EMAIL,
                              CV_LAST_BY_EMAIL, CV_LIST_PARAMETERS)
 from .serializers import CVSerializer, CoverLetterSerializer, CVGenerationSerializer, DownloadCVRequestSerializer, \
     ExtractTextFromCVResponseSerializer, User, ExtractTextFromCVUploadRequestSerializer
 from ..models import CV
-from ..service import analyze_cv_with_ai, extract_text_from_pdf_bytes
+from ..analysis_cache import cv_analysis_cache
+from ..service import CV_ANALYSIS_MODEL, extract_text_from_pdf_bytes
+from ..tasks import enqueue_cv_text_analysis
 
 logger = logging.getLogger(__name__)
 
@@ -74,11 +85,11 @@ def handle_serializer_validation(serializer, logger, view_name):
                400: OpenApiResponse(description="Validation Error"),
                500: OpenApiResponse(description="Server Error")},
 )
-class GenerateCVView(APIView):
+class GenerateCVView(AsyncAPIView):
     permission_classes = [AllowAny]
     parser_classes = [JSONParser]
 
-    def post(self, request) -> Response:
+    async def post(self, request) -> Response:
         serializer = CVGenerationSerializer(data=request.data)
         validation_response = handle_serializer_validation(serializer, logger, "GenerateCVView")
         if validation_response:
@@ -116,8 +127,8 @@ class GenerateCVView(APIView):
         """
 
         try:
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(
+            response = await ai_gateway.generate_gemini(
+                'gemini-2.5-flash',
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     max_output_tokens=2000,
@@ -181,13 +192,13 @@ class GenerateCVView(APIView):
         500: OpenApiResponse(description="Server Error")
     },
 )
-class AdaptCoverLetterView(APIView):
+class AdaptCoverLetterView(AsyncAPIView):
     permission_classes = [AllowAny]
     parser_classes = [JSONParser]
 
     MAX_RETRIES = 3
 
-    def post(self, request) -> Response:
+    async def post(self, request) -> Response:
         serializer = CoverLetterSerializer(data=request.data)
         validation_response = handle_serializer_validation(serializer, logger, "AdaptCoverLetterView")
         if validation_response:
@@ -216,11 +227,10 @@ class AdaptCoverLetterView(APIView):
         )
 
         try:
-            model = genai.GenerativeModel('gemini-2.5-flash')
-
             for attempt in range(self.MAX_RETRIES):
                 logger.debug("Sending prompt to AI (attempt %d): %s", attempt + 1, prompt)
-                response = model.generate_content(
+                response = await ai_gateway.generate_gemini(
+                    'gemini-2.5-flash',
                     prompt,
                     generation_config=genai.types.GenerationConfig(max_output_tokens=2000)
                 )
@@ -234,7 +244,7 @@ class AdaptCoverLetterView(APIView):
                     attempt + 1,
                     response.candidates[0].finish_reason if response.candidates else "unknown"
                 )
-                time.sleep(1)  # small delay before retry
+                await asyncio.sleep(1)  # small delay before retry
 
             return Response(
                 {'error': 'No cover letter generated after multiple attempts. Please try again later.'},
@@ -250,9 +260,10 @@ class AdaptCoverLetterView(APIView):
     responses={200: CV_LIST_RESPONSE},
     parameters=CV_LIST_PARAMETERS
 )
-class CVListCreateView(generics.ListCreateAPIView):
-    queryset = CV.objects.all()
+class CVListCreateView(StreamingListMixin, generics.ListCreateAPIView):
+    queryset = CV.objects.with_details()
     serializer_class = CVSerializer
+    pagination_class = CVCursorPagination
     permission_classes = [AllowAny]
     parser_classes = [MultiPartParser, FormParser]
 
@@ -271,13 +282,22 @@ class CVListCreateView(generics.ListCreateAPIView):
     responses={200: CV_DETAIL_RESPONSE, 204: CV_DELETE_RESPONSE}
 )
 class CVRetrieveDestroyView(generics.RetrieveDestroyAPIView):
-    queryset = CV.objects.all()
+    queryset = CV.objects.with_details()
     serializer_class = CVSerializer
     permission_classes = [AllowAny]
 
     def delete(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    # Match прив'язаний до користувача, а не до резюме: збіги видаленого резюме прибираються, а решта резюме
+    # користувача позначається як непідібрана, щоб ендпоінт збігів перерахував їх для нового останнього резюме.
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            super().perform_destroy(instance)
+            Match.objects.filter(user_id=instance.user_id).delete()
+            CV.objects.filter(user_id=instance.user_id).update(matched_at=None)
+            CVCatalogGeneration.bump()
+
 
 @extend_schema(**CV_BY_EMAIL)
 class CVByEmailPostView(APIView):
@@ -287,8 +307,8 @@ class CVByEmailPostView(APIView):
         email = request.data.get('email')
         if not email:
             return Response({'error': 'Електронна пошта обов\'язкова.'}, status=status.HTTP_400_BAD_REQUEST)
-        cvs = CV.objects.filter(user__email__iexact=email)
-        if not cvs.exists():
+        cvs = list(CV.objects.with_details().filter(user__email__iexact=email))
+        if not cvs:
             return Response({'detail': f'Резюме для "{email}" не знайдено.'}, status=status.HTTP_404_NOT_FOUND)
         serializer = CVSerializer(cvs, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -302,7 +322,7 @@ class LastCVByEmailPostView(APIView):
         email = request.data.get('email')
         if not email:
             return Response({'error': 'Електронна пошта обов\'язкова.'}, status=status.HTTP_400_BAD_REQUEST)
-        cv = CV.objects.filter(user__email__iexact=email).order_by('-uploaded_at').first()
+        cv = CV.objects.with_details().filter(user__email__iexact=email).order_by('-created_at').first()
         if not cv:
             return Response({'detail': f'Резюме для "{email}" не знайдено.'}, status=status.HTTP_404_NOT_FOUND)
         serializer = CVSerializer(cv)
@@ -407,6 +427,9 @@ ANALYZE_CV_UPLOAD = {
         }
     },
     'responses': {
+        200: OpenApiResponse(description='Результат аналізу цього тексту вже є в кеші'),
+        202: OpenApiResponse(response=JobAcceptedSerializer,
+                             description='Аналіз поставлено в чергу, результат - у полі result завдання'),
         400: OpenApiResponse(description='Помилка в запиті або обробці PDF'),
         500: OpenApiResponse(description='Внутрішня помилка сервера'),
     }
@@ -416,14 +439,15 @@ ANALYZE_CV_UPLOAD = {
 @extend_schema(
     tags=["CVs"],
     summary="Аналізувати резюме з PDF файлу за допомогою ШІ",
-    description="Приймає PDF-файл резюме, витягує з нього текст, потім надсилає текст до ШІ для аналізу та видобування структурованих даних.",
+    description="Приймає PDF-файл резюме, витягує з нього текст і ставить у чергу його аналіз ШІ для видобування "
+                "структурованих даних. Стан і результат аналізу повертає status_url.",
     **ANALYZE_CV_UPLOAD,
 )
-class AnalyzeCVView(APIView):
+class AnalyzeCVView(AsyncAPIView):
     permission_classes = [AllowAny]
     parser_classes = [MultiPartParser, FormParser]
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         logger = logging.getLogger(__name__)
         serializer = AnalyzeCVUploadRequestSerializer(data=request.data)
 
@@ -437,7 +461,8 @@ class AnalyzeCVView(APIView):
             pdf_content_bytes = uploaded_pdf_file.read()
             pdf_stream = io.BytesIO(pdf_content_bytes)
 
-            extracted_text, method_used = extract_text_from_pdf_bytes(pdf_stream)
+            extracted_text, method_used = await sync_to_async(extract_text_from_pdf_bytes,
+                                                              thread_sensitive=False)(pdf_stream)
 
             if not extracted_text:
                 logger.warning(f"Не вдалося видобути текст з завантаженого PDF файлу: {uploaded_pdf_file.name}")
@@ -445,17 +470,15 @@ class AnalyzeCVView(APIView):
                     'error': 'Не вдалося видобути текст з PDF файлу. Файл може бути сканованим (без текстового шару), порожнім або пошкодженим.'},
                     status=status.HTTP_400_BAD_REQUEST)
 
-            import uuid
-            anonymous_user_id = uuid.uuid4()
-            temp_cv_id = uuid.uuid4()
+            # Той самий текст уже аналізувався - результат повертається одразу, інакше аналіз ставиться в чергу.
+            cached_analysis = await sync_to_async(cv_analysis_cache.get)(extracted_text, CV_ANALYSIS_MODEL)
+            if cached_analysis is not None:
+                logger.info(f"Аналіз завантаженого PDF файлу {uploaded_pdf_file.name} взято з кешу.")
+                return Response(cached_analysis, status=status.HTTP_200_OK)
 
-            ai_extracted_data = analyze_cv_with_ai(temp_cv_id, anonymous_user_id, cv_text_override=extracted_text)
-            if not ai_extracted_data or ai_extracted_data == '{}':
-                logger.error(f"ШІ не відповів, спробуйте ще раз.")
-                return Response({'error': 'Не вдалося отримати дані від ШІ.'}, status=status.HTTP_408_REQUEST_TIMEOUT)
-
-            logger.info(f"Аналіз завантаженого PDF файлу {uploaded_pdf_file.name} успішно завершено.")
-            return Response(ai_extracted_data, status=status.HTTP_200_OK)
+            job = await sync_to_async(enqueue_cv_text_analysis)(extracted_text)
+            logger.info(f"Аналіз завантаженого PDF файлу {uploaded_pdf_file.name} поставлено в чергу (завдання {job.id}).")
+            return job_accepted_response(request, job)
 
         except ValidationError as e:
             logger.warning(f"Помилка валідації при обробці PDF файлу {uploaded_pdf_file.name}: {e.message}")
@@ -484,25 +507,17 @@ class GetDownloadLinkView(APIView):
 
         logger.info(f"Шукаємо CV для user_id={user_id}, за ім'ям файлу: '{requested_filename}'")
 
-        user_cvs = CV.objects.filter(user_id=user_id)
-        cv = None
-        for c in user_cvs:
-            if basename(c.cv_file.name) == requested_filename:
-                cv = c
-                break
+        # Повний шлях (cvs/name.pdf) звіряється і з cv_file, ім'я файлу - лише з індексованим file_name.
+        lookup = Q(file_name=basename(requested_filename))
+        if basename(requested_filename) != requested_filename:
+            lookup &= Q(cv_file=requested_filename)
+        cv = CV.objects.filter(lookup, user_id=user_id).order_by('-created_at').first()
 
         if cv is None:
-            try:
-                cv = CV.objects.get(user_id=user_id, cv_file=requested_filename)
-                logger.info(f"Знайдено CV за повним шляхом: {cv.cv_file.name}")
-            except CV.DoesNotExist:
-                logger.warning(
-                    f"CV для user_id={user_id} з ім'ям файлу або шляхом '{requested_filename}' не знайдено серед {user_cvs.count()} CV.")
-                logger.debug(f"Доступні шляхи для user_id={user_id}: {[basename(c.cv_file.name) for c in user_cvs]}")
-                return Response({'error': 'CV не знайдено або файл не належить користувачеві.'},
-                                status=status.HTTP_404_NOT_FOUND)
-        else:
-            logger.info(f"Знайдено CV за ім'ям файлу: {cv.cv_file.name}")
+            logger.warning(f"CV для user_id={user_id} з ім'ям файлу або шляхом '{requested_filename}' не знайдено.")
+            return Response({'error': 'CV не знайдено або файл не належить користувачеві.'},
+                            status=status.HTTP_404_NOT_FOUND)
+        logger.info(f"Знайдено CV за ім'ям файлу: {cv.cv_file.name}")
 
         file_path = cv.cv_file.path
         logger.info(f"Перевіряємо файл за повним шляхом: {file_path}")
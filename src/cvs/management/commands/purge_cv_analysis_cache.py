@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from cvs.analysis_cache import cv_analysis_cache
+
+
+class Command(BaseCommand):
+    help = ("Видаляє з таблиці CVAnalysisResult результати аналізу CV, строк дії яких минув. "
+            "Призначена для періодичного запуску (cron), щоб збереження нових результатів не чистило таблицю.")
+
+    def handle(self, *args, **options):
+        deleted = cv_analysis_cache.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Видалено прострочених результатів аналізу CV: {deleted}."))
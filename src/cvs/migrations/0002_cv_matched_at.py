@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cvs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='matched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
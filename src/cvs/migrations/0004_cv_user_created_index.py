@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cvs', '0003_cv_created_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cv',
+            index=models.Index(fields=['user', '-created_at'], name='cv_user_created_idx'),
+        ),
+    ]
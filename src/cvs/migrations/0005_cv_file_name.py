@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cvs', '0004_cv_user_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='file_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunSQL(
+            sql="UPDATE cvs_cv SET file_name = regexp_replace(cv_file, '^.*/', '') WHERE cv_file <> ''",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='cv',
+            index=models.Index(fields=['user', 'file_name'], name='cv_user_file_name_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cvs', '0005_cv_file_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVAnalysisResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_sha256', models.CharField(help_text='SHA-256 видобутого тексту резюме', max_length=64)),
+                ('prompt_version', models.CharField(help_text='Версія CV_ANALYSIS_PROMPT', max_length=16)),
+                ('model_name', models.CharField(help_text='Модель ШІ, що виконала аналіз', max_length=100)),
+                ('content', models.TextField(help_text='Відповідь ШІ після очищення')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('text_sha256', 'prompt_version', 'model_name'), name='cv_analysis_result_key_unique')],
+            },
+        ),
+    ]
@@ -81,6 +81,18 @@ class Personal(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class CVQuerySet(models.QuerySet):
+    # План завантаження для CVSerializer: усі вкладені об'єкти за фіксовану кількість запитів незалежно від кількості CV.
+    def with_details(self):
+        return self.select_related('personal__address', 'work_options').prefetch_related(
+            models.Prefetch('work_experiences', queryset=WorkExperience.objects.order_by('order_index')),
+            models.Prefetch('educations', queryset=Education.objects.order_by('order_index')),
+            models.Prefetch('courses', queryset=Course.objects.order_by('order_index')),
+            models.Prefetch('skills', queryset=Skill.objects.order_by('order_index')),
+            models.Prefetch('languages', queryset=Language.objects.order_by('order_index')),
+        )
+
+
 class CV(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -90,9 +102,12 @@ class CV(models.Model):
     id = models.BigAutoField(primary_key=True)  # Temporarily keep as BigAutoField to avoid casting issues
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cvs')
     cv_file = models.FileField(upload_to='cvs/', storage=CVFileStorage, blank=True)
+    # Ім'я файлу без шляху, для пошуку посилання на завантаження одним індексованим запитом
+    file_name = models.CharField(max_length=255, blank=True, default='', editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     locale = models.CharField(max_length=10, default='uk-UA')
     analyzed = models.BooleanField(default=False)
+    matched_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -114,6 +129,15 @@ class CV(models.Model):
     salary_max = models.PositiveIntegerField(null=True, blank=True)
     salary_currency = models.CharField(max_length=3, blank=True)
 
+    objects = CVQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='cv_created_id_idx'),
+            models.Index(fields=['user', '-created_at'], name='cv_user_created_idx'),
+            models.Index(fields=['user', 'file_name'], name='cv_user_file_name_idx'),
+        ]
+
     def clean(self):
         super().clean()
         if self.salary_min is not None and self.salary_max is not None and self.salary_min > self.salary_max:
@@ -123,6 +147,17 @@ class CV(models.Model):
     def cv_file_name(self):
         return self.cv_file.name.split('/')[-1] if self.cv_file.name else ''
 
+    # Сховище може перейменувати файл під час збереження, тож новий файл зберігається тут, як це зробив би
+    # FileField.pre_save, і file_name потрапляє в той самий INSERT/UPDATE.
+    def save(self, *args, **kwargs):
+        if self.cv_file and not self.cv_file._committed:
+            self.cv_file.save(self.cv_file.name, self.cv_file.file, save=False)
+        self.file_name = self.cv_file_name
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'cv_file' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'file_name'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         first_name = self.personal.first_name if self.personal else 'Unknown'
         last_name = self.personal.last_name if self.personal else 'Unknown'
@@ -216,3 +251,18 @@ class Language(models.Model):
     level = models.CharField(max_length=10, choices=LEVEL_CHOICES, null=True, blank=True)
     description = models.TextField(blank=True)
     order_index = models.PositiveIntegerField(default=0)
+
+
+class CVAnalysisResult(models.Model):
+    text_sha256 = models.CharField(max_length=64, help_text="SHA-256 видобутого тексту резюме")
+    prompt_version = models.CharField(max_length=16, help_text="Версія CV_ANALYSIS_PROMPT")
+    model_name = models.CharField(max_length=100, help_text="Модель ШІ, що виконала аналіз")
+    content = models.TextField(help_text="Відповідь ШІ після очищення")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['text_sha256', 'prompt_version', 'model_name'],
+                                    name='cv_analysis_result_key_unique'),
+        ]
@@ -1,4 +1,5 @@
 import io
+import json
 import logging
 
 import pdfplumber
@@ -7,10 +8,13 @@ from django.core.exceptions import ValidationError
 
 from src.openapi.prompts import CV_ANALYSIS_PROMPT
 from src.openapi.service import call_openapi_ai
+from .analysis_cache import cv_analysis_cache
 from .models import CV
 
 logger = logging.getLogger(__name__)
 
+CV_ANALYSIS_MODEL = getattr(settings, 'OPENAPI_AI_MODEL', 'default-model')
+
 
 def extract_text_from_cv(cv):
     if not cv.cv_file:
@@ -36,44 +40,73 @@ def extract_text_from_cv(cv):
         raise ValidationError(f'Сталася неочікувана помилка під час обробки файлу резюме: {str(e)}')
 
 
+def _load_cv_text(cv_id, user_id, cv_text_override=None):
+    if cv_text_override is not None:
+        logger.info(f"Використовується cv_text_override для аналізу (cv_id: {cv_id}, user_id: {user_id}).")
+        return cv_text_override
+
+    logger.info(f"Шукаємо CV з ID {cv_id} для користувача {user_id}")
+    cv = CV.objects.get(id=cv_id, user_id=user_id)
+    logger.info(f"Знайдено CV {cv.id} для користувача {user_id}")
+    extracted_text, method_used, extracted_cv_id, filename = extract_text_from_cv(cv)
+
+    if not extracted_text:
+        logger.error(f"Не вдалося видобути текст із CV {cv.id}")
+        raise ValidationError(
+            'Не вдалося видобути текст із PDF файлу. Файл може бути сканованим (без текстового шару), порожнім або пошкодженим.')
+    return extracted_text
+
+
+def _cv_analysis_messages(extracted_text):
+    prompt = CV_ANALYSIS_PROMPT.format(cv_text=extracted_text)
+    return [{"role": "user", "content": prompt}]
+
+
+def _cv_analysis_content(ai_response_data):
+    # call_openapi_ai повертає {} при помилці виклику: це не результат аналізу, і кешувати його не можна.
+    if not ai_response_data:
+        raise Exception("ШІ не повернув відповіді.")
+
+    content = ""
+    if 'choices' in ai_response_data and ai_response_data['choices']:
+        content = ai_response_data['choices'][0].get('message', {}).get('content', '')
+    elif 'message' in ai_response_data:
+        content = ai_response_data.get('message', {}).get('content', '')
+    else:
+        content = str(ai_response_data)
+
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.endswith("```"):
+        content = content[:-3]
+    content = content.strip()
+
+    if not content:
+        logger.error(f"Content порожній після обробки відповіді ШІ: {ai_response_data}")
+        raise Exception("Порожній content від ШІ.")
+    return content
+
+
+# Відповідь ШІ як словник; None, якщо це не JSON-об'єкт. Такі відповіді не кешуються, тож наступний аналіз
+# того самого тексту знову звернеться до ШІ.
+def parse_cv_analysis(content):
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
 def analyze_cv_with_ai(cv_id, user_id, cv_text_override=None):
     try:
-        if cv_text_override is not None:
-            logger.info(f"Використовується cv_text_override для аналізу (cv_id: {cv_id}, user_id: {user_id}).")
-            extracted_text = cv_text_override
-        else:
-            logger.info(f"Шукаємо CV з ID {cv_id} для користувача {user_id}")
-            cv = CV.objects.get(id=cv_id, user_id=user_id)
-            logger.info(f"Знайдено CV {cv.id} для користувача {user_id}")
-            extracted_text, method_used, extracted_cv_id, filename = extract_text_from_cv(cv)
-
-            if not extracted_text:
-                logger.error(f"Не вдалося видобути текст із CV {cv.id}")
-                raise ValidationError(
-                    'Не вдалося видобути текст із PDF файлу. Файл може бути сканованим (без текстового шару), порожнім або пошкодженим.')
-
-        prompt = CV_ANALYSIS_PROMPT.format(cv_text=extracted_text)
-        ai_response_data = call_openapi_ai(messages=[{"role": "user", "content": prompt}],
-                                           model=getattr(settings, 'OPENAPI_AI_MODEL', 'default-model'))
-
-        content = ""
-        if 'choices' in ai_response_data and ai_response_data['choices']:
-            content = ai_response_data['choices'][0].get('message', {}).get('content', '')
-        elif 'message' in ai_response_data:
-            content = ai_response_data.get('message', {}).get('content', '')
-        else:
-            content = str(ai_response_data)
-
-        content = content.strip()
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-
-        if not content:
-            logger.error(f"Content порожній після обробки відповіді ШІ: {ai_response_data}")
-            raise Exception("Порожній content від ШІ.")
+        extracted_text = _load_cv_text(cv_id, user_id, cv_text_override)
+        content = cv_analysis_cache.get(extracted_text, CV_ANALYSIS_MODEL)
+        if content is None:
+            ai_response_data = call_openapi_ai(messages=_cv_analysis_messages(extracted_text), model=CV_ANALYSIS_MODEL)
+            content = _cv_analysis_content(ai_response_data)
+            if parse_cv_analysis(content) is not None:
+                cv_analysis_cache.set(extracted_text, CV_ANALYSIS_MODEL, content)
         return content
 
     except ValidationError:
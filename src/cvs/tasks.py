@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import uuid
+
+from django.db import transaction
+
+from jobs.models import Job, JobStatus
+from jobs.service import PermanentJobError, enqueue, job_handler
+from matching.models import CVCatalogGeneration
+
+from .models import CV, Language, Skill, WorkOptions
+from .service import analyze_cv_with_ai, extract_text_from_cv, parse_cv_analysis
+
+logger = logging.getLogger(__name__)
+
+WORK_OPTION_FLAGS = ['is_office', 'is_remote', 'is_hybrid', 'willing_to_relocate']
+
+
+def _strings(values, max_length):
+    if not isinstance(values, list):
+        return []
+    return [value.strip()[:max_length] for value in values if isinstance(value, str) and value.strip()]
+
+
+def _children(cv, model, items, max_name_length):
+    levels = {choice for choice, label in model.LEVEL_CHOICES}
+    objs = []
+    for index, item in enumerate(items if isinstance(items, list) else []):
+        if not isinstance(item, dict) or not isinstance(item.get('name'), str) or not item['name'].strip():
+            continue
+        order_index = item.get('order_index')
+        objs.append(model(
+            cv=cv,
+            name=item['name'].strip()[:max_name_length],
+            level=item.get('level') if item.get('level') in levels else None,
+            description=item.get('description') if isinstance(item.get('description'), str) else '',
+            order_index=order_index if isinstance(order_index, int) and order_index >= 0 else index,
+        ))
+    return objs
+
+
+def _apply_work_options(user_cv, data):
+    if not isinstance(data, dict):
+        return False
+    work_options = user_cv.work_options
+    created = work_options is None
+    if created:
+        work_options = WorkOptions()
+    for field in ('countries', 'cities'):
+        if not getattr(work_options, field):
+            setattr(work_options, field, _strings(data.get(field), 50))
+    for field in WORK_OPTION_FLAGS:
+        if getattr(work_options, field) is None and isinstance(data.get(field), bool):
+            setattr(work_options, field, data[field])
+    work_options.save()
+    user_cv.work_options = work_options
+    return created
+
+
+def _apply_salary(user_cv, data):
+    if not isinstance(data, dict) or user_cv.salary_min is not None or user_cv.salary_max is not None:
+        return []
+    salary_min, salary_max = (data.get(field) for field in ('salary_min', 'salary_max'))
+    user_cv.salary_min = salary_min if isinstance(salary_min, int) and salary_min >= 0 else None
+    user_cv.salary_max = salary_max if isinstance(salary_max, int) and salary_max >= 0 else None
+    if user_cv.salary_min is not None and user_cv.salary_max is not None and user_cv.salary_min > user_cv.salary_max:
+        user_cv.salary_min, user_cv.salary_max = user_cv.salary_max, user_cv.salary_min
+    currency = data.get('salary_currency')
+    if not user_cv.salary_currency and isinstance(currency, str) and len(currency.strip()) == 3:
+        user_cv.salary_currency = currency.strip().upper()
+    return ['salary_min', 'salary_max', 'salary_currency']
+
+
+# Дані з файлу резюме доповнюють CV, а не замінюють його: навички, мови, умови роботи та зарплата
+# записуються лише там, де користувач їх не вказав. Саме з цих записів cv_matching_features будує ознаки підбору.
+def apply_cv_analysis(user_cv):
+    extracted_text, method_used, extracted_cv_id, filename = extract_text_from_cv(user_cv)
+    if not extracted_text:
+        raise PermanentJobError(f"Не вдалося видобути текст із резюме {user_cv.id}.")
+
+    content = analyze_cv_with_ai(
+        user_cv.id,
+        user_cv.user.id if user_cv.user else None,
+        cv_text_override=extracted_text
+    )
+    ai_extracted_data = parse_cv_analysis(content)
+    if ai_extracted_data is None:
+        raise PermanentJobError(f"Відповідь ШІ для резюме {user_cv.id} не є JSON-об'єктом: {content[:200]}")
+    logger.debug(f"Дані від ШІ отримано для резюме {user_cv.id}.")
+
+    with transaction.atomic():
+        updated_fields_list = ['analyzed', 'matched_at']
+        if _apply_work_options(user_cv, ai_extracted_data.get('work_options')):
+            updated_fields_list.append('work_options')
+        updated_fields_list += _apply_salary(user_cv, ai_extracted_data.get('salary'))
+        if not user_cv.skills.exists():
+            Skill.objects.bulk_create(_children(user_cv, Skill, ai_extracted_data.get('skills'), 200))
+        if not user_cv.languages.exists():
+            Language.objects.bulk_create(_children(user_cv, Language, ai_extracted_data.get('languages'), 50))
+
+        user_cv.analyzed = True
+        # Збіги цього резюме буде перераховано при наступному запиті до /api/matching/
+        user_cv.matched_at = None
+        user_cv.save(update_fields=updated_fields_list)
+        CVCatalogGeneration.bump()
+    logger.info(f"Резюме {user_cv.id} успішно проаналізовано та оновлено в БД.")
+    return ai_extracted_data
+
+
+@job_handler('cvs.analyze_cv')
+def analyze_cv(cv_id):
+    user_cv = CV.objects.filter(pk=cv_id).select_related('user', 'work_options').first()
+    if user_cv is None:
+        raise PermanentJobError(f"Резюме {cv_id} не знайдено.")
+    if not user_cv.analyzed:
+        apply_cv_analysis(user_cv)
+    return {'cv_id': user_cv.id, 'analyzed': True}
+
+
+@job_handler('cvs.analyze_text')
+def analyze_cv_text(cv_text):
+    return analyze_cv_with_ai(uuid.uuid4(), uuid.uuid4(), cv_text_override=cv_text)
+
+
+# Завдання, що вже завершилося помилкою для цієї версії резюме, повертається замість нового: інакше кожен
+# GET підбору знову ставив би в чергу аналіз, який гарантовано впаде. Повтор - після зміни CV або requeue_dead.
+def enqueue_cv_analysis(user_cv):
+    dedup_key = str(user_cv.id)
+    failed = Job.objects.filter(
+        kind='cvs.analyze_cv', dedup_key=dedup_key, status__in=[JobStatus.FAILED, JobStatus.DEAD],
+        finished_at__gte=user_cv.updated_at,
+    ).order_by('-finished_at').first()
+    if failed is not None:
+        return failed
+    return enqueue('cvs.analyze_cv', {'cv_id': user_cv.id}, dedup_key=dedup_key)
+
+
+def enqueue_cv_text_analysis(cv_text):
+    return enqueue('cvs.analyze_text', {'cv_text': cv_text},
+                   dedup_key=hashlib.sha256(cv_text.encode('utf-8')).hexdigest())
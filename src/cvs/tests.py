@@ -0,0 +1,290 @@
+import io
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from cvs.analysis_cache import CV_ANALYSIS_CACHE_ALIAS, CVAnalysisCache, cv_analysis_cache
+from cvs.models import (CV, Address, Course, CVAnalysisResult, Education, Language, Personal, Skill, WorkExperience,
+                        WorkOptions)
+from cvs.tasks import enqueue_cv_analysis
+from jobs.models import Job, JobStatus
+from jobs.service import claim_jobs, run_job
+from matching.cache import MATCH_CACHE_ALIAS
+from matching.features import cv_matching_features, vacancy_matching_features
+from matching.models import Match
+from vacancy.index import VacancyIndex, vacancy_index
+from vacancy.models import Vacancy
+
+User = get_user_model()
+
+# Стеля запитів для списку та деталей CV: один SELECT з select_related і по одному prefetch на кожен
+# вкладений список (досвід, освіта, курси, навички, мови).
+CV_DETAIL_QUERIES = 6
+
+
+def create_full_cv(username, **fields):
+    user = User.objects.create(username=username, email=f"{username}@example.com")
+    address = Address.objects.create(city='Kyiv', country='Ukraine')
+    personal = Personal.objects.create(first_name='Test', last_name='User', email=user.email, address=address)
+    work_options = WorkOptions.objects.create(cities=['Kyiv'], is_remote=True)
+    cv = CV.objects.create(user=user, personal=personal, work_options=work_options, **fields)
+    for n in range(2):
+        WorkExperience.objects.create(cv=cv, position='Developer', company=f'Company {n}',
+                                      start_date=date(2020 + n, 1, 1), order_index=n)
+        Education.objects.create(cv=cv, major='CS', institution=f'University {n}', start_date=date(2015, 9, 1),
+                                 order_index=n)
+        Course.objects.create(cv=cv, name=f'Course {n}', provider='Provider', start_date=date(2019, 1, 1),
+                              order_index=n)
+        Skill.objects.create(cv=cv, name=f'Skill {n}', order_index=n)
+        Language.objects.create(cv=cv, name=f'Language {n}', level='B2', order_index=n)
+    return cv
+
+
+class CVQueryCountTests(TestCase):
+    def setUp(self):
+        self.cvs = [create_full_cv(f'user-{n}') for n in range(3)]
+
+    def test_list_queries_do_not_grow_with_cv_count(self):
+        with self.assertNumQueries(CV_DETAIL_QUERIES):
+            response = self.client.get(reverse('cv-list-create'))
+        self.assertEqual(len(response.json()['results']), 3)
+
+        self.cvs += [create_full_cv(f'more-{n}') for n in range(4)]
+        with self.assertNumQueries(CV_DETAIL_QUERIES):
+            response = self.client.get(reverse('cv-list-create'))
+        results = response.json()['results']
+        self.assertEqual(len(results), 7)
+        self.assertEqual(len(results[0]['skills']), 2)
+
+    def test_stream_queries_do_not_grow_with_cv_count(self):
+        with self.assertNumQueries(CV_DETAIL_QUERIES):
+            response = self.client.get(reverse('cv-list-create'), {'stream': '1'})
+            b''.join(response.streaming_content)
+
+    def test_detail_queries(self):
+        with self.assertNumQueries(CV_DETAIL_QUERIES):
+            response = self.client.get(reverse('cv-detail', args=[self.cvs[0].id]))
+        self.assertEqual(len(response.json()['work_experiences']), 2)
+
+
+class CVFileNameTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='files', email='files@example.com')
+        self.cvs = []
+
+    def tearDown(self):
+        for cv in self.cvs:
+            cv.cv_file.delete(save=False)
+
+    def test_file_name_is_written_in_the_same_query(self):
+        for _ in range(2):
+            cv = CV(user=self.user, cv_file=SimpleUploadedFile('same.pdf', b'%PDF-1.4'))
+            with self.assertNumQueries(1):
+                cv.save()
+            self.cvs.append(cv)
+            self.assertEqual(CV.objects.get(pk=cv.pk).file_name, cv.cv_file.name.split('/')[-1])
+        # Друге збереження сховище перейменовує, і file_name має відповідати новому імені.
+        self.assertNotEqual(self.cvs[0].file_name, self.cvs[1].file_name)
+
+    def test_update_fields_with_file_include_file_name(self):
+        cv = CV.objects.create(user=self.user)
+        self.cvs.append(cv)
+        cv.cv_file = SimpleUploadedFile('later.pdf', b'%PDF-1.4')
+        with self.assertNumQueries(1):
+            cv.save(update_fields=['cv_file'])
+        self.assertEqual(CV.objects.get(pk=cv.pk).file_name, cv.file_name)
+        self.assertTrue(cv.file_name.startswith('later'))
+
+
+@mock.patch.object(VacancyIndex, '_rebuild_in_background')
+class CVDeleteMatchesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='two-cvs', email='two-cvs@example.com')
+        self.older = CV.objects.create(user=self.user, analyzed=True)
+        Skill.objects.create(cv=self.older, name='Go')
+        self.newer = CV.objects.create(user=self.user, analyzed=True)
+        Skill.objects.create(cv=self.newer, name='Python')
+        self.vacancies = [Vacancy.objects.create(title=f'{skill} developer', skills=[skill],
+                                                 **vacancy_matching_features({'skills': [skill]}))
+                          for skill in ('Go', 'Python')]
+        caches[MATCH_CACHE_ALIAS].clear()
+        vacancy_index.invalidate()
+
+    def matched_vacancies(self):
+        response = self.client.get(reverse('matches-for-user', args=[self.user.id]))
+        return [match['vacancy_id'] for match in response.json()]
+
+    def test_deleting_latest_cv_rematches_the_previous_one(self, rebuild_in_background):
+        self.assertEqual(self.matched_vacancies(), [self.vacancies[1].id])
+        # Старіше резюме вже колись підбиралося: без скидання matched_at воно вважалося б актуальним.
+        CV.objects.filter(pk=self.older.pk).update(matched_at=timezone.now())
+
+        response = self.client.delete(reverse('cv-detail', args=[self.newer.id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Match.objects.filter(user=self.user).exists())
+        self.assertEqual(self.matched_vacancies(), [self.vacancies[0].id])
+
+
+class CVDownloadQueryCountTests(TestCase):
+    def setUp(self):
+        self.cv = create_full_cv('owner', cv_file=SimpleUploadedFile('resume.pdf', b'%PDF-1.4'))
+
+    def tearDown(self):
+        self.cv.cv_file.delete(save=False)
+
+    def test_download_link_and_file_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('get-download-link'),
+                                        {'user_id': self.cv.user_id, 'filename': self.cv.file_name},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        token = response.json()['download_url'].rstrip('/').split('/')[-1]
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('download-cv-file', args=[token]))
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4')
+
+
+class CVAnalysisCacheTests(TestCase):
+    def setUp(self):
+        self.cache = CVAnalysisCache(stats_every=3)
+        self.cache.clear()
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_set_keeps_expired_rows_until_purge(self):
+        self.cache.set('old text', 'model', '{"old": true}')
+        CVAnalysisResult.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.cache.set('new text', 'model', '{"new": true}')
+        self.assertEqual(CVAnalysisResult.objects.count(), 2)
+
+        out = io.StringIO()
+        call_command('purge_cv_analysis_cache', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(list(CVAnalysisResult.objects.values_list('content', flat=True)), ['{"new": true}'])
+
+    def test_hit_and_miss_counters_are_logged(self):
+        self.cache.set('text', 'model', '{}')
+        caches[CV_ANALYSIS_CACHE_ALIAS].clear()
+        with self.assertLogs('cvs.analysis_cache', level='INFO') as logs:
+            self.assertIsNone(self.cache.get('other text', 'model'))
+            self.assertEqual(self.cache.get('text', 'model'), '{}')
+            self.assertEqual(self.cache.get('text', 'model'), '{}')
+        self.assertEqual(self.cache.stats(), {'memory_hits': 1, 'db_hits': 1, 'misses': 1})
+        summaries = [line for line in logs.output if 'звернень' in line]
+        self.assertEqual(len(summaries), 1)
+        self.assertIn("3 звернень, влучань у пам'ять 1, у БД 1, промахів 1", summaries[0])
+
+
+# Найпростіший PDF з одним рядком тексту, який читає pdfplumber.
+def minimal_pdf(text):
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+               b"/Resources << /Font << /F1 5 0 R >> >> >>",
+               b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+AI_ANALYSIS = {
+    'position_target': 'Backend Developer',
+    'work_options': {'countries': ['Ukraine'], 'cities': ['Lviv'], 'is_office': None, 'is_remote': True,
+                     'is_hybrid': False, 'willing_to_relocate': 'maybe'},
+    'skills': [{'name': 'Python', 'level': 'expert', 'order_index': 0},
+               {'name': 'Django', 'level': 'guru', 'order_index': 1}, 'SQL'],
+    'languages': [{'name': 'English', 'level': 'B2', 'order_index': 0}],
+    'salary': {'salary_min': 2000, 'salary_max': 3000, 'salary_currency': 'usd'},
+}
+
+
+def ai_reply(content):
+    return {'choices': [{'message': {'content': content}}]}
+
+
+# Обробник cvs.analyze_cv виконується через run_job на справжньому PDF; підмінено лише HTTP-виклик ШІ.
+# run_job закриває з'єднання з БД, тож тест працює без загальної транзакції TestCase.
+# Запити ендпоінта збігів читають з основної бази, куди пише воркер, навіть якщо задано DB_REPLICA_HOST.
+@mock.patch('shared.db_routing.replica_configured', return_value=False)
+class CVAnalysisJobTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='analyzed', email='analyzed@example.com')
+        self.cv = CV.objects.create(user=self.user, cv_file=SimpleUploadedFile(
+            'resume.pdf', minimal_pdf('Backend developer: Python, Django. English B2.')))
+        cv_analysis_cache.clear()
+
+    def tearDown(self):
+        self.cv.cv_file.delete(save=False)
+        cv_analysis_cache.clear()
+
+    def run_analysis(self, content):
+        job = enqueue_cv_analysis(self.cv)
+        with mock.patch('cvs.service.call_openapi_ai', return_value=ai_reply(content)) as call_ai:
+            for claimed in claim_jobs('test-worker', 1):
+                run_job(claimed)
+        job.refresh_from_db()
+        self.cv.refresh_from_db()
+        return job, call_ai
+
+    def test_analysis_writes_cv_rows(self, replica_configured):
+        job, call_ai = self.run_analysis(json.dumps(AI_ANALYSIS))
+
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+        self.assertIn('Python, Django', call_ai.call_args.kwargs['messages'][0]['content'])
+        self.assertTrue(self.cv.analyzed)
+        features = cv_matching_features(self.cv)
+        self.assertEqual(features['skills'], ['Python', 'Django'])
+        self.assertEqual(list(self.cv.skills.order_by('order_index').values_list('level', flat=True)),
+                         ['expert', None])
+        self.assertEqual(features['languages'], [{'language': 'English', 'level': 'B2'}])
+        self.assertEqual((features['cities'], features['is_remote'], features['is_hybrid']), (['Lviv'], True, False))
+        self.assertIsNone(features['willing_to_relocate'])
+        self.assertEqual((features['salary_min'], features['salary_max'], features['salary_currency']),
+                         (2000, 3000, 'USD'))
+
+    def test_analysis_keeps_data_entered_by_user(self, replica_configured):
+        Skill.objects.create(cv=self.cv, name='Go')
+        self.cv.salary_min = 5000
+        self.cv.save()
+
+        self.run_analysis(json.dumps(AI_ANALYSIS))
+        self.assertEqual(list(self.cv.skills.values_list('name', flat=True)), ['Go'])
+        self.assertEqual((self.cv.salary_min, self.cv.salary_max), (5000, None))
+        self.assertEqual(self.cv.languages.count(), 1)
+
+    def test_unparseable_output_fails_and_is_not_reenqueued(self, replica_configured):
+        with self.assertLogs('jobs.service', level='ERROR'):
+            job, call_ai = self.run_analysis('Sorry, I cannot help with that.')
+
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertEqual(job.attempts, 1)
+        self.assertFalse(self.cv.analyzed)
+        self.assertFalse(CVAnalysisResult.objects.exists())
+
+        for _ in range(2):
+            response = self.client.get(reverse('matches-for-user', args=[self.user.id]))
+            self.assertEqual(response.json()['job_id'], str(job.id))
+        self.assertEqual(Job.objects.count(), 1)
+
+        # Після зміни резюме аналіз ставиться в чергу знову.
+        self.cv.save()
+        self.assertNotEqual(enqueue_cv_analysis(self.cv).id, job.id)
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+from jobs.models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'attempts', 'max_attempts', 'result', 'error', 'run_after',
+                  'created_at', 'updated_at', 'finished_at']
+        read_only_fields = fields
+
+
+class JobAcceptedSerializer(serializers.Serializer):
+    job_id = serializers.UUIDField()
+    status = serializers.CharField()
+    status_url = serializers.URLField()
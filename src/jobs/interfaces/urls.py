@@ -0,0 +1,6 @@
+from django.urls import path
+from jobs.interfaces.views import JobStatusView
+
+urlpatterns = [
+    path('<uuid:job_id>/', JobStatusView.as_view(), name='job-status'),
+]
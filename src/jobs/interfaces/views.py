@@ -0,0 +1,31 @@
+from django.urls import reverse
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework import generics, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from jobs.interfaces.serializers import JobSerializer
+from jobs.models import Job
+
+
+# Відповідь 202 для ендпоінтів, які ставлять роботу ШІ в чергу: клієнт опитує status_url до завершення.
+def job_accepted_response(request, job):
+    return Response({
+        'job_id': str(job.id),
+        'status': job.status,
+        'status_url': request.build_absolute_uri(reverse('job-status', args=[job.id])),
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema(
+    tags=["Jobs"],
+    summary="Стан фонового завдання",
+    description="Повертає стан завдання з черги: queued, running, succeeded, failed або dead. "
+                "Після succeeded результат обробки знаходиться в полі result.",
+    responses={200: JobSerializer, 404: OpenApiResponse(description="Завдання не знайдено")},
+)
+class JobStatusView(generics.RetrieveAPIView):
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [AllowAny]
+    lookup_url_kwarg = 'job_id'
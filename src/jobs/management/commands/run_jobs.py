@@ -0,0 +1,61 @@
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import autodiscover_modules
+
+from jobs.service import JOB_HANDLERS, JOB_VISIBILITY_TIMEOUT, claim_jobs, requeue_dead, run_job
+
+
+class Command(BaseCommand):
+    help = ("Виконує завдання з черги jobs.Job у пулі потоків. Завдання здебільшого чекають на відповідь ШІ, "
+            "тож потоки не обмежуються кількістю ядер.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Кількість потоків-виконавців.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Пауза між опитуваннями порожньої черги, секунд.")
+        parser.add_argument('--visibility-timeout', type=int, default=JOB_VISIBILITY_TIMEOUT,
+                            help="Через скільки секунд незавершене завдання знову стає доступним іншим воркерам.")
+        parser.add_argument('--once', action='store_true', help="Виконати доступні завдання і завершитися.")
+        parser.add_argument('--requeue-dead', action='store_true',
+                            help="Повернути завдання з dead-letter у чергу перед запуском.")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers < 1 or options['poll_interval'] <= 0 or options['visibility_timeout'] < 1:
+            raise CommandError("--workers, --poll-interval і --visibility-timeout мають бути додатними.")
+
+        autodiscover_modules('tasks')
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"Воркер {worker_id}: {workers} потоків, обробники: {', '.join(sorted(JOB_HANDLERS))}.")
+
+        if options['requeue_dead']:
+            self.stdout.write(f"Повернуто в чергу завдань з dead-letter: {requeue_dead()}.")
+
+        processed = 0
+        running = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                while True:
+                    jobs = claim_jobs(worker_id, workers - len(running), options['visibility_timeout']) \
+                        if len(running) < workers else []
+                    running.update(executor.submit(run_job, job) for job in jobs)
+
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    done, running = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    processed += len(done)
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING(
+                    f"Зупинка: очікується завершення {len(running)} завдань, нові не беруться."))
+                wait(running)
+                processed += len(running)
+
+        self.stdout.write(self.style.SUCCESS(f"Воркер {worker_id} завершив роботу, оброблено завдань: {processed}."))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:01
+
+import django.core.serializers.json
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(help_text='Назва обробника завдання', max_length=100)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Аргументи обробника')),
+                ('dedup_key', models.CharField(blank=True, max_length=255, null=True)),
+                ('status', models.CharField(choices=[('queued', 'У черзі'), ('running', 'Виконується'), ('succeeded', 'Виконано'), ('failed', 'Помилка без повторів'), ('dead', 'Вичерпано спроби')], default='queued', max_length=20)),
+                ('result', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3)),
+                ('run_after', models.DateTimeField(help_text='Не запускати раніше цього моменту')),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Кінець тайм-ауту видимості; після нього завдання знову доступне', null=True)),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100)),
+                ('lock_token', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['run_after'], name='job_queued_run_after_idx'), models.Index(condition=models.Q(('status', 'running')), fields=['locked_until'], name='job_running_locked_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('kind', 'dedup_key'), name='job_active_dedup_key_unique')],
+            },
+        ),
+    ]
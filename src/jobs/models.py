@@ -0,0 +1,51 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = 'queued', 'У черзі'
+    RUNNING = 'running', 'Виконується'
+    SUCCEEDED = 'succeeded', 'Виконано'
+    FAILED = 'failed', 'Помилка без повторів'
+    DEAD = 'dead', 'Вичерпано спроби'
+
+
+ACTIVE_JOB_STATUSES = [JobStatus.QUEUED, JobStatus.RUNNING]
+
+
+class Job(models.Model):
+    class Meta:
+        constraints = [
+            # Одне активне завдання на dedup_key: повторна постановка повертає наявне.
+            models.UniqueConstraint(fields=['kind', 'dedup_key'], condition=Q(status__in=ACTIVE_JOB_STATUSES),
+                                    name='job_active_dedup_key_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['run_after'], condition=Q(status=JobStatus.QUEUED), name='job_queued_run_after_idx'),
+            models.Index(fields=['locked_until'], condition=Q(status=JobStatus.RUNNING),
+                         name='job_running_locked_idx'),
+        ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=100, help_text="Назва обробника завдання")
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder, help_text="Аргументи обробника")
+    dedup_key = models.CharField(max_length=255, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    result = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(help_text="Не запускати раніше цього моменту")
+    locked_until = models.DateTimeField(blank=True, null=True,
+                                        help_text="Кінець тайм-ауту видимості; після нього завдання знову доступне")
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    lock_token = models.UUIDField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Job {self.kind} {self.id} ({self.status})"
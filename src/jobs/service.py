@@ -0,0 +1,142 @@
+import logging
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from jobs.models import ACTIVE_JOB_STATUSES, Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_ATTEMPTS = getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+JOB_VISIBILITY_TIMEOUT = getattr(settings, 'JOB_VISIBILITY_TIMEOUT', 600)
+JOB_RETRY_BACKOFF = getattr(settings, 'JOB_RETRY_BACKOFF', 30)
+JOB_RETRY_BACKOFF_MAX = getattr(settings, 'JOB_RETRY_BACKOFF_MAX', 3600)
+
+# kind -> функція-обробник; заповнюється декоратором job_handler у модулях tasks.py застосунків.
+JOB_HANDLERS = {}
+
+
+class PermanentJobError(Exception):
+    pass
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, dedup_key=None, max_attempts=JOB_MAX_ATTEMPTS, delay=0):
+    if dedup_key is not None:
+        active = Job.objects.filter(kind=kind, dedup_key=dedup_key, status__in=ACTIVE_JOB_STATUSES).first()
+        if active is not None:
+            return active
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(
+                kind=kind,
+                payload=payload or {},
+                dedup_key=dedup_key,
+                max_attempts=max_attempts,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        # Те саме завдання паралельно поставив інший запит.
+        return Job.objects.get(kind=kind, dedup_key=dedup_key, status__in=ACTIVE_JOB_STATUSES)
+    logger.info(f"Завдання {job.kind} {job.id} поставлено в чергу.")
+    return job
+
+
+def _retry_delay(attempts):
+    return random.uniform(0, min(JOB_RETRY_BACKOFF_MAX, JOB_RETRY_BACKOFF * 2 ** (attempts - 1)))
+
+
+# Рядки блокуються через SELECT ... FOR UPDATE SKIP LOCKED, тож кілька воркерів не отримають те саме завдання.
+# Завдання, воркер якого не завершив роботу до locked_until, знову стає доступним (тайм-аут видимості).
+def claim_jobs(worker_id, limit, visibility_timeout=JOB_VISIBILITY_TIMEOUT):
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=JobStatus.QUEUED, run_after__lte=now) |
+                    Q(status=JobStatus.RUNNING, locked_until__lt=now))
+            .order_by('run_after')[:limit]
+        )
+        claimed = []
+        for job in jobs:
+            if job.status == JobStatus.RUNNING and job.attempts >= job.max_attempts:
+                logger.error(f"Завдання {job.kind} {job.id} перевищило тайм-аут видимості на останній спробі.")
+                job.status = JobStatus.DEAD
+                job.error = job.error or "Перевищено тайм-аут видимості."
+                job.finished_at = now
+                job.locked_until = None
+                job.save(update_fields=['status', 'error', 'finished_at', 'locked_until', 'updated_at'])
+                continue
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.lock_token = uuid.uuid4()
+            job.locked_until = now + timedelta(seconds=visibility_timeout)
+            job.save(update_fields=['status', 'attempts', 'locked_by', 'lock_token', 'locked_until', 'updated_at'])
+            claimed.append(job)
+    return claimed
+
+
+# Оновлення виконуються лише за lock_token: якщо завдання вже забрав інший воркер після тайм-ауту видимості,
+# запізнілий результат відкидається.
+def _finish(job, **fields):
+    updated = Job.objects.filter(pk=job.pk, lock_token=job.lock_token).update(
+        locked_until=None, lock_token=None, updated_at=timezone.now(), **fields)
+    if not updated:
+        logger.warning(f"Завдання {job.kind} {job.id} вже забрав інший воркер, результат відкинуто.")
+
+
+def run_job(job):
+    close_old_connections()
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise PermanentJobError(f"Невідомий тип завдання: {job.kind}")
+        result = handler(**job.payload)
+    except PermanentJobError as e:
+        logger.error(f"Завдання {job.kind} {job.id} завершилося помилкою: {e}")
+        _finish(job, status=JobStatus.FAILED, error=str(e), finished_at=timezone.now())
+    except Exception as e:
+        if job.attempts >= job.max_attempts:
+            logger.error(f"Завдання {job.kind} {job.id} переміщено до dead-letter після {job.attempts} спроб: {e}",
+                         exc_info=True)
+            _finish(job, status=JobStatus.DEAD, error=str(e), finished_at=timezone.now())
+        else:
+            delay = _retry_delay(job.attempts)
+            logger.warning(f"Завдання {job.kind} {job.id} (спроба {job.attempts}/{job.max_attempts}) завершилося "
+                           f"помилкою, повтор через {delay:.0f} с: {e}")
+            _finish(job, status=JobStatus.QUEUED, error=str(e),
+                    run_after=timezone.now() + timedelta(seconds=delay))
+    else:
+        _finish(job, status=JobStatus.SUCCEEDED, result=result, error='', finished_at=timezone.now())
+        logger.info(f"Завдання {job.kind} {job.id} виконано.")
+    finally:
+        close_old_connections()
+
+
+# Повертає завдання з dead-letter у чергу; пропускає ті, для чиїх dedup_key вже є активне завдання.
+def requeue_dead(kind=None):
+    jobs = Job.objects.filter(status=JobStatus.DEAD)
+    if kind:
+        jobs = jobs.filter(kind=kind)
+    requeued = 0
+    for job_id in jobs.values_list('id', flat=True):
+        try:
+            with transaction.atomic():
+                requeued += Job.objects.filter(pk=job_id, status=JobStatus.DEAD).update(
+                    status=JobStatus.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None,
+                    updated_at=timezone.now())
+        except IntegrityError:
+            logger.warning(f"Завдання {job_id} не повернуто в чергу: вже є активне завдання з тим самим ключем.")
+    return requeued
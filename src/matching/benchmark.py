@@ -0,0 +1,175 @@
+import math
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+
+from cvs.models import CV, Skill, WorkOptions
+from matching.features import LEVEL_HIERARCHY, apply_matching_features
+from vacancy.models import City, Country, Currency, EnglishLevel, Vacancy, VacancyCategory
+
+User = get_user_model()
+
+BASE_SKILLS = [
+    'Python', 'Django', 'FastAPI', 'Flask', 'PostgreSQL', 'MySQL', 'Redis', 'Docker', 'Kubernetes', 'AWS',
+    'GCP', 'Azure', 'Linux', 'Git', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Vue', 'Node.js',
+    'Java', 'Spring', 'Kotlin', 'Swift', 'C#', '.NET', 'C++', 'Go', 'Rust', 'PHP', 'Laravel', 'Ruby',
+    'Rails', 'SQL', 'MongoDB', 'Kafka', 'RabbitMQ', 'Terraform', 'Ansible', 'CI/CD', 'Pandas', 'NumPy',
+    'PyTorch', 'TensorFlow', 'Figma', 'Selenium', 'Jira', 'GraphQL', 'REST', 'Elasticsearch',
+]
+LANGUAGE_NAMES = ['English', 'Ukrainian', 'German', 'Polish']
+SALARY_STEPS = {'USD': (500, 8000, 250), 'EUR': (500, 7000, 250), 'UAH': (15000, 250000, 5000)}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+# Генератор корпусу: навички мають Zipf-подібний розподіл (популярні трапляються частіше),
+# категорії, міста та валюти беруться з тих самих TextChoices, що й у моделі Vacancy.
+class SyntheticCorpus:
+    def __init__(self, seed=42, skill_vocabulary_size=2000):
+        self.random = random.Random(seed)
+        self.skills_vocabulary = BASE_SKILLS + [f"skill-{i}" for i in range(skill_vocabulary_size - len(BASE_SKILLS))]
+        self.skill_weights = [1 / (rank + 1) for rank in range(len(self.skills_vocabulary))]
+        self.categories = list(VacancyCategory.values)
+        self.cities = [c for c in City.values if c != City.REMOTE]
+        self.countries = list(Country.values)
+        self.currencies = list(Currency.values)
+
+    def skills(self, low=3, high=12):
+        k = self.random.randint(low, high)
+        return sorted(set(self.random.choices(self.skills_vocabulary, weights=self.skill_weights, k=k)))
+
+    def salary(self):
+        currency = self.random.choice(self.currencies)
+        low, high, step = SALARY_STEPS[currency]
+        salary_min = self.random.randrange(low, high, step)
+        salary_max = salary_min + step * self.random.randint(0, 8)
+        if self.random.random() < 0.3:
+            return None, None, None
+        return salary_min, salary_max, currency
+
+    def location(self):
+        is_remote = self.random.random() < 0.4
+        cities = self.random.sample(self.cities, self.random.randint(0 if is_remote else 1, 3))
+        return cities, [Country.UKRAINE.value] if cities else self.random.sample(self.countries, 1), is_remote
+
+    def languages(self):
+        return [{"language": self.random.choice(LANGUAGE_NAMES), "level": self.random.choice(EnglishLevel.values)}]
+
+    def vacancy(self, number):
+        salary_min, salary_max, salary_currency = self.salary()
+        cities, countries, is_remote = self.location()
+        vacancy = Vacancy(
+            title=f"Benchmark vacancy {number}",
+            level=self.random.choice(LEVEL_HIERARCHY),
+            categories=self.random.sample(self.categories, self.random.randint(1, 2)),
+            countries=countries,
+            cities=cities,
+            is_remote=is_remote,
+            is_hybrid=not is_remote and self.random.random() < 0.3,
+            languages=self.languages(),
+            skills=self.skills(),
+            salary_min=salary_min,
+            salary_max=salary_max,
+            salary_currency=salary_currency,
+        )
+        return apply_matching_features(vacancy)
+
+    def cv_features(self):
+        salary_min, salary_max, salary_currency = self.salary()
+        cities, countries, is_remote = self.location()
+        return {
+            'skills': self.skills(5, 15),
+            'languages': [],
+            'level': None,
+            'categories': self.random.sample(self.categories, self.random.randint(1, 3)),
+            'countries': countries,
+            'cities': cities,
+            'is_office': None,
+            'is_remote': is_remote,
+            'is_hybrid': None,
+            'willing_to_relocate': None,
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+            'salary_currency': salary_currency or '',
+        }
+
+
+def seed_vacancies(corpus, count, batch_size=2000):
+    for start in range(0, count, batch_size):
+        Vacancy.objects.bulk_create([corpus.vacancy(n) for n in range(start, min(start + batch_size, count))])
+
+
+def seed_cvs(corpus, count):
+    profiles = []
+    for n in range(count):
+        features = corpus.cv_features()
+        user = User.objects.create(username=f"benchmark-{n}")
+        work_options = WorkOptions.objects.create(
+            cities=features['cities'], countries=features['countries'], is_remote=features['is_remote'])
+        cv = CV.objects.create(
+            user=user,
+            analyzed=True,
+            work_options=work_options,
+            salary_min=features['salary_min'],
+            salary_max=features['salary_max'],
+            salary_currency=features['salary_currency'],
+        )
+        Skill.objects.bulk_create([Skill(cv=cv, name=name) for name in features['skills']])
+        profiles.append((cv, features))
+    return profiles
+
+
+# Час вимірюється без tracemalloc (він сповільнює виконання), пікова пам'ять - окремим прогоном.
+def measure(func, repeat):
+    timings, queries, errors = [], [], 0
+    for i in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            ok = func(i)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+        if ok is False:
+            errors += 1
+
+    tracemalloc.start()
+    func(0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries_mean': round(statistics.fmean(queries), 2),
+        'queries_max': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'errors': errors,
+    }
+
+
+# Фільтри get_filtered_vacancies, для яких план має використовувати GIN-індекси Vacancy.
+def index_checks(corpus):
+    return [
+        ('categories', 'vacancy_categories_gin', Q(categories__overlap=corpus.categories[:1])),
+        ('cities', 'vacancy_cities_gin', Q(cities__overlap=corpus.cities[:1])),
+        ('countries', 'vacancy_countries_gin', Q(countries__overlap=corpus.countries[-1:])),
+        ('languages', 'vacancy_languages_gin', Q(languages__contains=[{"language": LANGUAGE_NAMES[-1]}])),
+        ('skills', 'vacancy_skills_normalized_gin', Q(skills_normalized__overlap=[corpus.skills_vocabulary[-1]])),
+    ]
+
+
+def explain_filters(corpus):
+    plans = []
+    for name, index_name, condition in index_checks(corpus):
+        plan = Vacancy.objects.filter(condition).only('id').explain()
+        plans.append({'filter': name, 'index': index_name, 'index_used': index_name in plan, 'plan': plan})
+    return plans
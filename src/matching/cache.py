@@ -0,0 +1,63 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+
+from matching.engine import match_quality_for
+from matching.materialize import matches_are_stale, read_ranked_matches, rematch_cv
+from matching.models import VacancyCatalogGeneration
+
+logger = logging.getLogger(__name__)
+
+MATCH_CACHE_ALIAS = getattr(settings, 'MATCH_CACHE_ALIAS', 'matching')
+MATCH_CACHE_MAX_ROWS = getattr(settings, 'MATCH_CACHE_MAX_ROWS', 200)
+
+
+def match_cache_key(user_cv, generation, limit=None, min_score=None, after=None):
+    after_key = f"{after[0]}:{after[1]}" if after is not None else ''
+    return f"matches:{user_cv.id}:{user_cv.updated_at.timestamp()}:{generation}:{limit}:{min_score}:{after_key}"
+
+
+# Запис кешу - кортеж (vacancy_id, title, score, skills, location, salary) однієї сторінки в порядку read_ranked_matches.
+# match_quality не зберігається, бо однозначно виводиться з score.
+def _pack(matches):
+    return tuple(
+        (m['vacancy_id'], m['title'], m['score'], m['skills_match'], m['location_match'], m['salary_match'])
+        for m in matches
+    )
+
+
+def _unpack(row):
+    vacancy_id, title, score, skills, location, salary = row
+    return {
+        'vacancy_id': vacancy_id,
+        'title': title,
+        'score': score,
+        'match_quality': match_quality_for(score),
+        'skills_match': skills,
+        'location_match': location,
+        'salary_match': salary,
+    }
+
+
+# Сторінка читається з Match за індексом (user, -score, vacancy) з LIMIT і курсором, тож і запит, і запис кешу
+# мають розмір O(limit). LocMemCache обмежує лише кількість записів, тому повний список без limit кешується,
+# тільки якщо він не довший за MATCH_CACHE_MAX_ROWS.
+def get_ranked_matches(user_cv, limit=None, min_score=None, after=None):
+    cache = caches[MATCH_CACHE_ALIAS]
+    key = match_cache_key(user_cv, VacancyCatalogGeneration.current(), limit, min_score, after)
+
+    if matches_are_stale(user_cv):
+        logger.info(f"Збіги резюме {user_cv.id} застаріли, виконується перерахунок.")
+        rematch_cv(user_cv)
+    else:
+        rows = cache.get(key)
+        if rows is not None:
+            return [_unpack(row) for row in rows]
+
+    matches = read_ranked_matches(user_cv.user_id, limit=limit if limit is not None else MATCH_CACHE_MAX_ROWS + 1,
+                                  min_score=min_score, after=after)
+    if limit is None and len(matches) > MATCH_CACHE_MAX_ROWS:
+        return read_ranked_matches(user_cv.user_id, min_score=min_score, after=after)
+    cache.set(key, _pack(matches))
+    return matches
@@ -0,0 +1,67 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from cvs.models import CV
+from matching.engine import CVCatalog
+from matching.features import cv_matching_features
+from matching.models import CVCatalogGeneration
+
+logger = logging.getLogger(__name__)
+
+CV_CATALOG_TTL = getattr(settings, 'CV_CATALOG_TTL', 300)
+CV_CATALOG_CHUNK_SIZE = 2000
+
+
+def latest_analyzed_cvs():
+    return CV.objects.filter(analyzed=True).order_by('user_id', '-created_at').distinct('user_id')
+
+
+# Ознаки беруться тим самим cv_matching_features, що й у прямому підборі; зв'язані записи
+# завантажуються пакетами через prefetch_related. Матриця позначається поколінням з основної бази,
+# тож і читається звідти, а не з репліки.
+def load_cv_feature_rows():
+    cvs = latest_analyzed_cvs().using(DEFAULT_DB_ALIAS).select_related('work_options').prefetch_related('skills', 'languages')
+    rows = [(cv.id, cv.user_id, cv_matching_features(cv)) for cv in cvs.iterator(chunk_size=CV_CATALOG_CHUNK_SIZE)]
+    return sorted(rows, key=lambda row: row[0])
+
+
+# Матриця перебудовується, коли змінюється CVCatalogGeneration (збереження, аналіз чи видалення резюме)
+# або минає CV_CATALOG_TTL - на випадок змін в обхід API, наприклад в адмінці.
+class CVCatalogCache:
+    def __init__(self, ttl=CV_CATALOG_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._generation = None
+        self._loaded_at = None
+
+    def get(self):
+        generation = CVCatalogGeneration.current()
+        with self._lock:
+            expired = self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+            if self._catalog is None or expired or generation != self._generation:
+                self._catalog = CVCatalog(load_cv_feature_rows())
+                self._generation = generation
+                self._loaded_at = time.monotonic()
+                logger.info(f"Матрицю ознак резюме перебудовано (покоління {generation}): {len(self._catalog)} резюме.")
+            return self._catalog
+
+    def invalidate(self):
+        with self._lock:
+            self._catalog = None
+
+
+cv_catalog_cache = CVCatalogCache()
+
+
+def rank_candidates_for_vacancy(vacancy, limit=None, min_score=None):
+    catalog = cv_catalog_cache.get()
+    if not len(catalog):
+        return []
+    scores = catalog.score(vacancy)
+    rows = catalog.top(scores, limit=limit, min_score=min_score, mask=catalog.accepts(vacancy))
+    return catalog.to_candidates(scores, rows)
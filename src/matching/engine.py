@@ -0,0 +1,439 @@
+from bisect import bisect_left
+from operator import attrgetter
+
+import numpy as np
+
+from matching.features import (cv_language_terms, normalize_level, normalize_terms, salary_base_range,
+                               vacancy_language_terms)
+
+MATCH_WEIGHTS = {
+    'skills': 0.5,
+    'location': 0.2,
+    'salary': 0.2,
+    'level': 0.1
+}
+
+
+def match_quality_for(score):
+    if score >= 80:
+        return "High"
+    if score >= 50:
+        return "Medium"
+    return "Low"
+
+
+# Рядки з найвищою оцінкою (при рівності - з меншим ID) після курсора `after` = (score, id), серед дозволених `mask`.
+# Оцінки цілі, тож порядок (score desc, id asc) кодується одним int64-ключем; з `limit` np.argpartition
+# відбирає K найменших ключів за O(N), і сортуються лише ці K рядків.
+def select_top(total, ids, limit=None, min_score=None, after=None, mask=None):
+    mask = np.ones(len(total), dtype=bool) if mask is None else mask.copy()
+    if min_score is not None:
+        mask &= total >= min_score
+    if after is not None:
+        after_score, after_id = after
+        mask &= (total < after_score) | ((total == after_score) & (ids > after_id))
+
+    rows = np.flatnonzero(mask)
+    if not rows.size:
+        return []
+    scores = total[rows].astype(np.int64)
+    row_ids = ids[rows].astype(np.int64)
+    id_offsets = row_ids - row_ids.min()
+    key = (scores.max() - scores) * (id_offsets.max() + 1) + id_offsets
+    if limit is not None and limit < len(rows):
+        if limit <= 0:
+            return []
+        selected = np.argpartition(key, limit - 1)[:limit]
+        rows, key = rows[selected], key[selected]
+    return rows[np.argsort(key)].tolist()
+
+
+# CSR-подібна матриця: для кожного рядка (вакансії) зберігаються ID термів зі спільного словника.
+class TermMatrix:
+    def __init__(self, rows_terms):
+        self.vocab = {}
+        indices = []
+        sizes = []
+        for terms in rows_terms:
+            for term in terms:
+                indices.append(self.vocab.setdefault(term, len(self.vocab)))
+            sizes.append(len(terms))
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+        self.rows = np.repeat(np.arange(len(sizes), dtype=np.int64), self.sizes)
+
+    def overlap_counts(self, terms):
+        mask = np.zeros(len(self.vocab), dtype=np.float64)
+        known = [self.vocab[t] for t in terms if t in self.vocab]
+        if known:
+            mask[known] = 1.0
+        counts = np.bincount(self.rows, weights=mask[self.indices], minlength=len(self.sizes))
+        return counts.astype(np.int64)
+
+
+# Стовпець діапазонів зарплат (NumericRange з Decimal-межами або None). Межі не округлюються: кожна з них
+# кодується рангом у відсортованому списку унікальних меж стовпця (2i + 1), а межа запиту, якої немає в списку,
+# отримує парний код між сусідами. Порівняння цілих кодів у NumPy точно відтворює порівняння Decimal
+# у check_salary_overlap.
+OPEN_LOWER = -1
+OPEN_UPPER = np.iinfo(np.int64).max
+
+
+class SalaryColumn:
+    def __init__(self, ranges):
+        ranges = list(ranges)
+        present = [r for r in ranges if r is not None and not r.isempty]
+        self.bounds = sorted({bound for r in present for bound in (r.lower, r.upper) if bound is not None})
+        self.missing = np.asarray([r is None for r in ranges], dtype=bool)
+        self.empty = np.asarray([r is not None and r.isempty for r in ranges], dtype=bool)
+        self.lo = np.asarray([self.code(r.lower, OPEN_LOWER) if r is not None and not r.isempty else OPEN_UPPER
+                              for r in ranges], dtype=np.int64)
+        self.hi = np.asarray([self.code(r.upper, OPEN_UPPER) if r is not None and not r.isempty else OPEN_LOWER
+                              for r in ranges], dtype=np.int64)
+
+    def code(self, value, open_code):
+        if value is None:
+            return open_code
+        position = bisect_left(self.bounds, value)
+        if position < len(self.bounds) and self.bounds[position] == value:
+            return 2 * position + 1
+        return 2 * position
+
+    def scores(self, salary_range):
+        if salary_range is None:
+            return np.full(len(self.missing), 100, dtype=np.int64)
+        if salary_range.isempty:
+            return np.where(self.missing, 100, 0).astype(np.int64)
+        query_lo = self.code(salary_range.lower, OPEN_LOWER)
+        query_hi = self.code(salary_range.upper, OPEN_UPPER)
+        overlap = ~self.empty & (self.lo <= query_hi) & (query_lo <= self.hi)
+        return np.where(self.missing | overlap, 100, 0).astype(np.int64)
+
+
+# Профіль будується зі словника matching.features.cv_matching_features.
+class CVProfile:
+    __slots__ = ('skills', 'cities', 'countries', 'is_remote', 'salary_range', 'level', 'level_rank')
+
+    def __init__(self, features):
+        self.skills = normalize_terms(features.get('skills'))
+        self.cities = normalize_terms(features.get('cities'))
+        self.countries = normalize_terms(features.get('countries'))
+        self.is_remote = features.get('is_remote')
+
+        self.salary_range = salary_base_range(
+            features.get('salary_min'),
+            features.get('salary_max'),
+            features.get('salary_currency'),
+        )
+
+        self.level, level_rank = normalize_level(features.get('level'))
+        self.level_rank = level_rank if level_rank is not None else -1
+
+
+# Лише колонки, потрібні для оцінювання: без description та інших великих полів.
+VACANCY_CATALOG_FIELDS = ('id', 'title', 'skills_normalized', 'cities_normalized', 'countries_normalized',
+                          'is_remote', 'is_hybrid', 'salary_range_base', 'level_normalized', 'level_rank')
+CATALOG_CHUNK_SIZE = 2000
+
+_vacancy_row = attrgetter(*VACANCY_CATALOG_FIELDS)
+
+
+# QuerySet читається вузькою проєкцією через серверний курсор; готові об'єкти (вже завантажені вакансії)
+# перетворюються на ті самі кортежі.
+def vacancy_rows(vacancies):
+    if hasattr(vacancies, 'values_list'):
+        return vacancies.values_list(*VACANCY_CATALOG_FIELDS).iterator(chunk_size=CATALOG_CHUNK_SIZE)
+    return map(_vacancy_row, vacancies)
+
+
+class VacancyCatalog:
+    def __init__(self, vacancies):
+        ids, titles = [], []
+        skills, cities, countries = [], [], []
+        remote_or_hybrid = []
+        salary_ranges = []
+        levels, level_ranks = [], []
+
+        # Ознаки вже нормалізовані при збереженні вакансії (див. matching.features), тож цикл лише збирає колонки.
+        for (vacancy_id, title, vacancy_skills, vacancy_cities, vacancy_countries, is_remote, is_hybrid,
+             salary_range, level, level_rank) in vacancy_rows(vacancies):
+            ids.append(vacancy_id)
+            titles.append(title)
+            skills.append(vacancy_skills or ())
+            cities.append(vacancy_cities or ())
+            countries.append(vacancy_countries or ())
+            remote_or_hybrid.append(bool(is_remote or is_hybrid))
+            salary_ranges.append(salary_range)
+
+            levels.append(level)
+            level_ranks.append(level_rank if level_rank is not None else -1)
+
+        self.ids = ids
+        self.titles = titles
+        self.skills = TermMatrix(skills)
+        self.cities = TermMatrix(cities)
+        self.countries = TermMatrix(countries)
+        self.remote_or_hybrid = np.asarray(remote_or_hybrid, dtype=bool)
+        self.salary = SalaryColumn(salary_ranges)
+
+        self.level_vocab = {}
+        self.level_ids = np.asarray(
+            [self.level_vocab.setdefault(lvl, len(self.level_vocab)) if lvl is not None else -1 for lvl in levels],
+            dtype=np.int64)
+        self.level_ranks = np.asarray(level_ranks, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _skills_scores(self, profile):
+        sizes = self.skills.sizes
+        intersection = self.skills.overlap_counts(profile.skills)
+        union = len(profile.skills) + sizes - intersection
+        ratio = intersection / np.maximum(union, 1) * 100
+        return np.where(sizes > 0, np.round(ratio), 0).astype(np.int64)
+
+    def _location_scores(self, profile):
+        n = len(self)
+        if profile.cities:
+            fallback = np.where(self.cities.overlap_counts(profile.cities) > 0, 100, 0)
+            if profile.countries:
+                country_hit = self.countries.overlap_counts(profile.countries) > 0
+                fallback = np.where((fallback == 0) & country_hit, 70, fallback)
+        elif profile.is_remote is None:
+            fallback = np.full(n, 50)
+        else:
+            fallback = np.zeros(n)
+
+        if profile.is_remote:
+            return np.where(self.remote_or_hybrid, 100, fallback).astype(np.int64)
+        return np.asarray(fallback, dtype=np.int64)
+
+    def _salary_scores(self, profile):
+        return self.salary.scores(profile.salary_range)
+
+    def _level_scores(self, profile):
+        n = len(self)
+        if profile.level is None:
+            return np.full(n, 100, dtype=np.int64)
+
+        present = self.level_ids >= 0
+        same = self.level_ids == self.level_vocab.get(profile.level, -2)
+        ranked = (self.level_ranks >= 0) & (profile.level_rank >= 0)
+        diff = self.level_ranks - profile.level_rank
+        ladder = np.select(
+            [diff == 0, diff == 1, diff > 1, diff == -1],
+            [100, 70, 30, 90],
+            default=70,
+        )
+        scores = np.where(ranked, ladder, 50)
+        scores = np.where(same, 100, scores)
+        return np.where(present, scores, 100).astype(np.int64)
+
+    def score(self, cv_features):
+        profile = cv_features if isinstance(cv_features, CVProfile) else CVProfile(cv_features)
+        skills = self._skills_scores(profile)
+        location = self._location_scores(profile)
+        salary = self._salary_scores(profile)
+        level = self._level_scores(profile)
+
+        total = (
+                        (skills / 100.0) * MATCH_WEIGHTS['skills'] +
+                        (location / 100.0) * MATCH_WEIGHTS['location'] +
+                        (salary / 100.0) * MATCH_WEIGHTS['salary'] +
+                        (level / 100.0) * MATCH_WEIGHTS['level']
+                ) * 100
+
+        return {
+            'score': np.round(total).astype(np.int64),
+            'skills_match': skills,
+            'location_match': location,
+            'salary_match': salary,
+            'level_match': level,
+        }
+
+    def to_matches(self, scores, rows=None):
+        if rows is None:
+            rows = range(len(self))
+        total, skills, location, salary = (scores[key] for key in
+                                           ('score', 'skills_match', 'location_match', 'salary_match'))
+        matches = []
+        for row in rows:
+            score = int(total[row])
+            matches.append({
+                'vacancy_id': self.ids[row],
+                'title': self.titles[row],
+                'score': score,
+                'match_quality': match_quality_for(score),
+                'skills_match': int(skills[row]),
+                'location_match': int(location[row]),
+                'salary_match': int(salary[row]),
+            })
+        return matches
+
+
+class VacancyProfile:
+    __slots__ = ('skills', 'cities', 'countries', 'remote_or_hybrid', 'salary_range', 'level', 'level_rank')
+
+    def __init__(self, vacancy):
+        self.skills = set(vacancy.skills_normalized or ())
+        self.cities = set(vacancy.cities_normalized or ())
+        self.countries = set(vacancy.countries_normalized or ())
+        self.remote_or_hybrid = bool(vacancy.is_remote or vacancy.is_hybrid)
+        self.salary_range = vacancy.salary_range_base
+        self.level = vacancy.level_normalized
+        self.level_rank = vacancy.level_rank if vacancy.level_rank is not None else -1
+
+
+# Дзеркальне представлення для зворотного підбору: рядки - резюме, запит - одна вакансія.
+# Формули ті самі, що й у VacancyCatalog, а accepts повторює фільтри 1-6 get_filtered_vacancies.
+class CVCatalog:
+    # rows - кортежі (cv_id, user_id, ознаки з cv_matching_features).
+    def __init__(self, rows):
+        ids, user_ids, profiles = [], [], []
+        categories, languages, filter_levels = [], [], []
+        raw_cities, raw_countries, remote_needed, relocate_ok = [], [], [], []
+        for cv_id, user_id, features in rows:
+            ids.append(cv_id)
+            user_ids.append(user_id)
+            profiles.append(CVProfile(features))
+            categories.append(features.get('categories') or ())
+            languages.append(cv_language_terms(features.get('languages')))
+            filter_levels.append(features.get('level') or None)
+            raw_cities.append(features.get('cities') or ())
+            raw_countries.append(features.get('countries') or ())
+            remote_needed.append(bool(features.get('is_remote')))
+            relocate_ok.append(features.get('willing_to_relocate') is not False)
+
+        self.ids = ids
+        self.id_array = np.asarray(ids, dtype=np.int64)
+        self.user_ids = user_ids
+        self.skills = TermMatrix(p.skills for p in profiles)
+        self.cities = TermMatrix(p.cities for p in profiles)
+        self.countries = TermMatrix(p.countries for p in profiles)
+        self.remote = np.asarray([bool(p.is_remote) for p in profiles], dtype=bool)
+        self.remote_unknown = np.asarray([p.is_remote is None for p in profiles], dtype=bool)
+        self.salary = SalaryColumn(p.salary_range for p in profiles)
+
+        self.level_vocab = {}
+        self.level_ids = np.asarray(
+            [self.level_vocab.setdefault(p.level, len(self.level_vocab)) if p.level is not None else -1
+             for p in profiles], dtype=np.int64)
+        self.level_ranks = np.asarray([p.level_rank for p in profiles], dtype=np.int64)
+
+        # Фільтри порівнюють сирі значення, як оператори && та @> у Postgres.
+        self.filter_categories = TermMatrix(categories)
+        self.filter_languages = TermMatrix(languages)
+        self.filter_level_vocab = {}
+        self.filter_level_ids = np.asarray(
+            [self.filter_level_vocab.setdefault(lvl, len(self.filter_level_vocab)) if lvl is not None else -1
+             for lvl in filter_levels], dtype=np.int64)
+        self.filter_cities = TermMatrix(raw_cities)
+        self.filter_countries = TermMatrix(raw_countries)
+        self.remote_needed = np.asarray(remote_needed, dtype=bool)
+        self.relocate_ok = np.asarray(relocate_ok, dtype=bool)
+
+    def accepts(self, vacancy):
+        # ФІЛЬТР 1: резюме без категорій не обмежується за категорією.
+        categories = self.filter_categories.overlap_counts(vacancy.categories or ()) > 0
+        accepted = (self.filter_categories.sizes == 0) | categories
+        # ФІЛЬТР 2
+        languages = self.filter_languages.overlap_counts(vacancy_language_terms(vacancy.languages)) > 0
+        accepted &= (self.filter_languages.sizes == 0) | languages
+        # ФІЛЬТР 3
+        level_id = self.filter_level_vocab.get(vacancy.level, -2)
+        accepted &= (self.filter_level_ids < 0) | (self.filter_level_ids == level_id)
+        # ФІЛЬТР 4
+        city_hit = self.filter_cities.overlap_counts(vacancy.cities or ()) > 0
+        country_hit = self.filter_countries.overlap_counts(vacancy.countries or ()) > 0
+        location = (self.remote_needed & (vacancy.is_remote is True)) | (self.relocate_ok & (city_hit | country_hit))
+        has_location_filter = self.remote_needed | (
+                self.relocate_ok & ((self.filter_cities.sizes > 0) | (self.filter_countries.sizes > 0)))
+        accepted &= ~has_location_filter | location
+        # ФІЛЬТР 5: перетин діапазонів зарплат - та сама умова, що дає 100 балів за зарплату.
+        accepted &= self.salary.scores(vacancy.salary_range_base) == 100
+        # ФІЛЬТР 6
+        accepted &= self.skills.overlap_counts(vacancy.skills_normalized or ()) > 0
+        return accepted
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _skills_scores(self, profile):
+        if not profile.skills:
+            return np.zeros(len(self), dtype=np.int64)
+        intersection = self.skills.overlap_counts(profile.skills)
+        union = self.skills.sizes + len(profile.skills) - intersection
+        return np.round(intersection / union * 100).astype(np.int64)
+
+    def _location_scores(self, profile):
+        city_hit = self.cities.overlap_counts(profile.cities) > 0
+        country_hit = (self.countries.sizes > 0) & (self.countries.overlap_counts(profile.countries) > 0)
+        by_city = np.where(city_hit, 100, np.where(country_hit, 70, 0))
+        fallback = np.where(self.remote_unknown, 50, 0)
+        scores = np.where(self.cities.sizes > 0, by_city, fallback)
+        if profile.remote_or_hybrid:
+            scores = np.where(self.remote, 100, scores)
+        return scores.astype(np.int64)
+
+    def _salary_scores(self, profile):
+        return self.salary.scores(profile.salary_range)
+
+    def _level_scores(self, profile):
+        n = len(self)
+        if profile.level is None:
+            return np.full(n, 100, dtype=np.int64)
+
+        present = self.level_ids >= 0
+        same = self.level_ids == self.level_vocab.get(profile.level, -2)
+        ranked = (self.level_ranks >= 0) & (profile.level_rank >= 0)
+        diff = profile.level_rank - self.level_ranks
+        ladder = np.select(
+            [diff == 0, diff == 1, diff > 1, diff == -1],
+            [100, 70, 30, 90],
+            default=70,
+        )
+        scores = np.where(ranked, ladder, 50)
+        scores = np.where(same, 100, scores)
+        return np.where(present, scores, 100).astype(np.int64)
+
+    def score(self, vacancy):
+        profile = vacancy if isinstance(vacancy, VacancyProfile) else VacancyProfile(vacancy)
+        skills = self._skills_scores(profile)
+        location = self._location_scores(profile)
+        salary = self._salary_scores(profile)
+        level = self._level_scores(profile)
+
+        total = (
+                        (skills / 100.0) * MATCH_WEIGHTS['skills'] +
+                        (location / 100.0) * MATCH_WEIGHTS['location'] +
+                        (salary / 100.0) * MATCH_WEIGHTS['salary'] +
+                        (level / 100.0) * MATCH_WEIGHTS['level']
+                ) * 100
+
+        return {
+            'score': np.round(total).astype(np.int64),
+            'skills_match': skills,
+            'location_match': location,
+            'salary_match': salary,
+            'level_match': level,
+        }
+
+    def top(self, scores, limit=None, min_score=None, after=None, mask=None):
+        return select_top(scores['score'], self.id_array, limit=limit, min_score=min_score, after=after, mask=mask)
+
+    def to_candidates(self, scores, rows):
+        total, skills, location, salary = (scores[key] for key in
+                                           ('score', 'skills_match', 'location_match', 'salary_match'))
+        candidates = []
+        for row in rows:
+            score = int(total[row])
+            candidates.append({
+                'cv_id': self.ids[row],
+                'user_id': self.user_ids[row],
+                'score': score,
+                'match_quality': match_quality_for(score),
+                'skills_match': int(skills[row]),
+                'location_match': int(location[row]),
+                'salary_match': int(salary[row]),
+            })
+        return candidates
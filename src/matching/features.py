@@ -0,0 +1,98 @@
+from django.db.backends.postgresql.psycopg_any import NumericRange
+
+from matching.salary import normalize_salary
+
+LEVEL_HIERARCHY = ['intern', 'junior', 'middle', 'senior', 'lead', 'director']
+LEVEL_RANKS = {level: rank for rank, level in enumerate(LEVEL_HIERARCHY)}
+
+BASE_CURRENCY = 'USD'
+
+MATCHING_SOURCE_FIELDS = ['skills', 'cities', 'countries', 'salary_min', 'salary_max', 'salary_currency', 'level']
+MATCHING_FEATURE_FIELDS = ['skills_normalized', 'cities_normalized', 'countries_normalized', 'salary_range_base',
+                           'level_normalized', 'level_rank']
+
+
+def normalize_terms(values):
+    return set(v.lower().strip() for v in (values or []) if v)
+
+
+# Закритий діапазон [min, max] у базовій валюті з тими самими Decimal, що дає normalize_salary, без округлення,
+# тож перетин діапазонів (GiST-індекс у Postgres або рушій підбору) збігається з check_salary_overlap.
+# None - зарплату не вказано або валюта невідома; нульова межа відкрита, як у check_salary_overlap;
+# перевернутий діапазон порожній і не перетинається з жодним іншим.
+def salary_base_range(salary_min, salary_max, currency):
+    norm_min, norm_max = normalize_salary(salary_min, salary_max, currency)
+    if norm_min is None and norm_max is None:
+        return None
+    lower, upper = norm_min or None, norm_max or None
+    if lower is not None and upper is not None and lower > upper:
+        return NumericRange(empty=True)
+    return NumericRange(lower, upper, '[]')
+
+
+def normalize_level(level):
+    if not level:
+        return None, None
+    level_normalized = level.lower().strip()
+    return level_normalized, LEVEL_RANKS.get(level_normalized)
+
+
+def vacancy_matching_features(data):
+    level_normalized, level_rank = normalize_level(data.get('level'))
+    return {
+        'skills_normalized': sorted(normalize_terms(data.get('skills'))),
+        'cities_normalized': sorted(normalize_terms(data.get('cities'))),
+        'countries_normalized': sorted(normalize_terms(data.get('countries'))),
+        'salary_range_base': salary_base_range(
+            data.get('salary_min'), data.get('salary_max'), data.get('salary_currency')
+        ),
+        'level_normalized': level_normalized,
+        'level_rank': level_rank,
+    }
+
+
+# Єдине джерело ознак резюме для підбору: фільтри get_filtered_vacancies, прямий (VacancyCatalog, SQL) та
+# зворотний (CVCatalog) рушії читають ці словники, тож обидва напрями дають однакові оцінки.
+# Модель CV не зберігає категорій і рівня, тож вони порожні, і фільтри 1 та 3 резюме не обмежують.
+def cv_matching_features(user_cv):
+    work_options = user_cv.work_options
+    return {
+        'skills': [skill.name for skill in user_cv.skills.all()],
+        'languages': [{'language': language.name, 'level': language.level} for language in user_cv.languages.all()],
+        'level': None,
+        'categories': [],
+        'countries': list(work_options.countries or []) if work_options else [],
+        'cities': list(work_options.cities or []) if work_options else [],
+        'is_office': work_options.is_office if work_options else None,
+        'is_remote': work_options.is_remote if work_options else None,
+        'is_hybrid': work_options.is_hybrid if work_options else None,
+        'willing_to_relocate': work_options.willing_to_relocate if work_options else None,
+        'salary_min': user_cv.salary_min,
+        'salary_max': user_cv.salary_max,
+        'salary_currency': user_cv.salary_currency,
+    }
+
+
+# Пари (мова, рівень), які задовольняє фільтр languages @> [{"language": ..., "level": ...}]:
+# для резюме - умови фільтра 2, для вакансії - усе, що містить її JSON-список мов.
+def cv_language_terms(languages):
+    return {(item.get('language'), item.get('level') or None) for item in languages or () if item.get('language')}
+
+
+def vacancy_language_terms(languages):
+    terms = set()
+    if not isinstance(languages, list):
+        return terms
+    for item in languages:
+        if isinstance(item, dict) and isinstance(item.get('language'), str):
+            terms.add((item['language'], None))
+            if isinstance(item.get('level'), str):
+                terms.add((item['language'], item['level']))
+    return terms
+
+
+def apply_matching_features(vacancy):
+    data = {field: getattr(vacancy, field) for field in MATCHING_SOURCE_FIELDS}
+    for field, value in vacancy_matching_features(data).items():
+        setattr(vacancy, field, value)
+    return vacancy
@@ -1,6 +1,7 @@
 from django.urls import path
-from matching.interfaces.views import MatchesForUserView
+from matching.interfaces.views import CandidatesForVacancyView, MatchesForUserView
 
 urlpatterns = [
     path('<int:user_id>/', MatchesForUserView.as_view(), name='matches-for-user'),
+    path('vacancy/<int:vacancy_id>/candidates/', CandidatesForVacancyView.as_view(), name='candidates-for-vacancy'),
 ]
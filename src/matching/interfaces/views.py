@@ -1,18 +1,44 @@
+import base64
 import logging
 
 from cvs.models import CV
+from cvs.tasks import enqueue_cv_analysis
 from django.contrib.auth import get_user_model
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
-from vacancy.models import Vacancy
 
-from src.matching.service import calculate_vacancy_matches_for_cv
-from src.vacancy.services import get_filtered_vacancies
+from jobs.interfaces.views import job_accepted_response
+from matching.cache import get_ranked_matches
+from matching.candidates import rank_candidates_for_vacancy
+from vacancy.models import Vacancy
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+MAX_MATCHES_PAGE_SIZE = 200
+DEFAULT_CANDIDATES_LIMIT = 50
+
+
+def encode_match_cursor(score, vacancy_id):
+    return base64.urlsafe_b64encode(f"{score}:{vacancy_id}".encode()).decode()
+
+
+def decode_match_cursor(cursor):
+    score, vacancy_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+    return int(score), int(vacancy_id)
+
+
+def parse_int_param(params, name, min_value, max_value):
+    raw = params.get(name)
+    if raw in (None, ''):
+        return None
+    value = int(raw)
+    if not min_value <= value <= max_value:
+        raise ValueError(name)
+    return value
+
 
 class MatchesForUserView(APIView):
     permission_classes = [AllowAny]
@@ -26,25 +52,78 @@ class MatchesForUserView(APIView):
                 logger.warning(f"Користувач з ID {user_id} не знайдений.")
                 return Response({'error': f'Користувач з ID {user_id} не знайдений.'}, status=404)
 
-            user_cv = CV.objects.filter(user=user).order_by('-uploaded_at').first()
+            user_cv = CV.objects.filter(user=user).order_by('-created_at').first()
             if not user_cv:
                 logger.info(f"Резюме для користувача {user_id} не знайдено")
                 return Response({'error': f'Резюме для користувача з ID {user_id} не знайдено.'}, status=404)
 
             if not user_cv.analyzed:
-                logger.info(f"Резюме {user_cv.id} користувача {user_id} ще не проаналізовано ШІ.")
+                job = enqueue_cv_analysis(user_cv)
+                logger.info(f"Резюме {user_cv.id} користувача {user_id} ще не проаналізовано ШІ, завдання {job.id}.")
+                return job_accepted_response(request, job)
+
+            try:
+                limit = parse_int_param(request.query_params, 'limit', 1, MAX_MATCHES_PAGE_SIZE)
+                min_score = parse_int_param(request.query_params, 'min_score', 0, 100)
+                cursor = request.query_params.get('cursor')
+                after = decode_match_cursor(cursor) if cursor else None
+            except (ValueError, UnicodeDecodeError):
                 return Response({
-                    'error': f'Резюме користувача з ID {user_id} ще не проаналізовано. Будь ласка, зачекайте завершення аналізу.'},
+                    'error': f'Некоректні параметри: limit має бути від 1 до {MAX_MATCHES_PAGE_SIZE}, '
+                             f'min_score - від 0 до 100, cursor - значення з поля next.'},
                     status=400)
 
-            filtered_vacancies_queryset = get_filtered_vacancies(user_cv)
-            logger.info(
-                f"Отримано {filtered_vacancies_queryset.count()} вакансій після фільтрації для користувача {user_id}")
+            paginated = limit is not None or after is not None
+            page_size = limit or MAX_MATCHES_PAGE_SIZE
+            matches = get_ranked_matches(
+                user_cv,
+                limit=page_size + 1 if paginated else None,
+                min_score=min_score,
+                after=after,
+            )
+            logger.info(f"Отримано {len(matches)} збігів для користувача {user_id}")
+
+            if not paginated:
+                return Response(matches)
 
-            matches = calculate_vacancy_matches_for_cv(user_cv, filtered_vacancies_queryset)
-            logger.info(f"Розраховано {len(matches)} збігів для користувача {user_id}")
-            return Response(matches)
+            next_url = None
+            if len(matches) > page_size:
+                matches = matches[:page_size]
+                last = matches[-1]
+                next_url = replace_query_param(
+                    request.build_absolute_uri(), 'cursor', encode_match_cursor(last['score'], last['vacancy_id']))
+            return Response({'next': next_url, 'results': matches})
 
         except Exception as e:
             logger.error(f"Несподівана помилка при підборі вакансій для користувача {user_id}: {e}", exc_info=True)
             return Response({'error': 'Внутрішня помилка сервера'}, status=500)
+
+
+class CandidatesForVacancyView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, vacancy_id):
+        try:
+            try:
+                vacancy = Vacancy.objects.get(pk=vacancy_id)
+            except Vacancy.DoesNotExist:
+                logger.warning(f"Вакансія з ID {vacancy_id} не знайдена.")
+                return Response({'error': f'Вакансія з ID {vacancy_id} не знайдена.'}, status=404)
+
+            try:
+                limit = parse_int_param(request.query_params, 'limit', 1, MAX_MATCHES_PAGE_SIZE)
+                min_score = parse_int_param(request.query_params, 'min_score', 0, 100)
+            except ValueError:
+                return Response({
+                    'error': f'Некоректні параметри: limit має бути від 1 до {MAX_MATCHES_PAGE_SIZE}, '
+                             f'min_score - від 0 до 100.'},
+                    status=400)
+
+            candidates = rank_candidates_for_vacancy(
+                vacancy, limit=limit or DEFAULT_CANDIDATES_LIMIT, min_score=min_score)
+            logger.info(f"Отримано {len(candidates)} кандидатів для вакансії {vacancy_id}")
+            return Response(candidates)
+
+        except Exception as e:
+            logger.error(f"Несподівана помилка при підборі кандидатів для вакансії {vacancy_id}: {e}", exc_info=True)
+            return Response({'error': 'Внутрішня помилка сервера'}, status=500)
@@ -0,0 +1,136 @@
+import json
+import subprocess
+from pathlib import Path
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.utils import timezone
+
+from matching.benchmark import SyntheticCorpus, explain_filters, measure, seed_cvs, seed_vacancies
+from matching.cache import MATCH_CACHE_ALIAS
+from matching.candidates import cv_catalog_cache
+from matching.engine import VacancyCatalog
+from matching.materialize import store_cv_matches
+from vacancy.index import vacancy_index
+from vacancy.models import Vacancy
+from vacancy.services import filter_vacancies
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ("Вимірює продуктивність підбору вакансій на синтетичному корпусі. "
+            "Дані створюються в транзакції, яка відкочується після вимірювань.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000', help="Кількість вакансій через кому.")
+        parser.add_argument('--cvs', type=int, default=50, help="Кількість проаналізованих резюме.")
+        parser.add_argument('--repeat', type=int, default=20, help="Кількість вимірювань кожного етапу.")
+        parser.add_argument('--seed', type=int, default=42, help="Зерно генератора корпусу.")
+        parser.add_argument('--explain', action='store_true',
+                            help="Перевірити через EXPLAIN, що фільтри вакансій використовують GIN-індекси.")
+        parser.add_argument('--output', default='benchmark_matching.json', help="Файл для результатів у JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes має бути списком цілих чисел через кому.")
+        if options['cvs'] < 1 or options['repeat'] < 1:
+            raise CommandError("--cvs і --repeat мають бути додатними.")
+
+        results, plans = [], []
+        for size in sizes:
+            self.stdout.write(f"Корпус: {size} вакансій, {options['cvs']} резюме...")
+            with transaction.atomic():
+                results.extend(self._run(size, options))
+                if options['explain']:
+                    plans.extend(self._explain(size, options))
+                transaction.set_rollback(True)
+        vacancy_index.rebuild()
+        cv_catalog_cache.invalidate()
+
+        report = {
+            'commit': _git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'seed': options['seed'],
+            'cvs': options['cvs'],
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        if options['explain']:
+            report['plans'] = plans
+        Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f"Результати збережено у {options['output']}."))
+
+        # На малих таблицях планувальник законно обирає послідовне сканування, тож перевіряється лише найбільший корпус.
+        missing = [plan['filter'] for plan in plans if plan['vacancies'] == max(sizes) and not plan['index_used']]
+        if missing:
+            raise CommandError(f"Фільтри не використовують GIN-індекси: {', '.join(missing)}")
+
+    def _explain(self, size, options):
+        plans = []
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE vacancy_vacancy')
+        for plan in explain_filters(SyntheticCorpus(seed=options['seed'])):
+            plans.append({'vacancies': size, **plan})
+            status = 'індекс' if plan['index_used'] else 'БЕЗ ІНДЕКСУ'
+            self.stdout.write(f"  EXPLAIN {plan['filter']}: {status} {plan['index']}")
+        return plans
+
+    def _run(self, size, options):
+        corpus = SyntheticCorpus(seed=options['seed'])
+        seed_vacancies(corpus, size)
+        profiles = seed_cvs(corpus, options['cvs'])
+        vacancy_index.rebuild()
+        cv_catalog_cache.invalidate()
+
+        for cv, features in profiles:
+            catalog = VacancyCatalog(filter_vacancies(features, cv.id))
+            store_cv_matches(cv, catalog, catalog.score(features) if len(catalog) else None)
+
+        vacancy_ids = list(Vacancy.objects.order_by('?').values_list('id', flat=True)[:options['repeat']])
+        client = Client()
+        match_cache = caches[MATCH_CACHE_ALIAS]
+
+        def profile_for(i):
+            return profiles[i % len(profiles)]
+
+        def filter_stage(i):
+            cv, features = profile_for(i)
+            list(filter_vacancies(features, cv.id).values_list('id', flat=True))
+
+        def pipeline_stage(i):
+            cv, features = profile_for(i)
+            catalog = VacancyCatalog(filter_vacancies(features, cv.id))
+            catalog.to_matches(catalog.score(features))
+
+        def matches_endpoint_stage(i):
+            match_cache.clear()
+            return client.get(f"/api/matching/{profile_for(i)[0].user_id}/?limit=50").status_code == 200
+
+        def candidates_endpoint_stage(i):
+            vacancy_id = vacancy_ids[i % len(vacancy_ids)]
+            return client.get(f"/api/matching/vacancy/{vacancy_id}/candidates/").status_code == 200
+
+        stages = [
+            ('filter', filter_stage),
+            ('pipeline', pipeline_stage),
+            ('matches_endpoint', matches_endpoint_stage),
+            ('candidates_endpoint', candidates_endpoint_stage),
+        ]
+        results = []
+        for name, stage in stages:
+            stats = measure(stage, options['repeat'])
+            results.append({'vacancies': size, 'stage': name, **stats})
+            self.stdout.write(
+                f"  {name}: p50 {stats['p50_ms']} мс, p95 {stats['p95_ms']} мс, "
+                f"запитів {stats['queries_mean']}, пам'ять {stats['peak_memory_kb']} КБ, помилок {stats['errors']}")
+        return results
@@ -0,0 +1,110 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from cvs.models import CV
+from matching.engine import VacancyCatalog
+from matching.candidates import latest_analyzed_cvs
+from matching.features import cv_matching_features
+from matching.materialize import store_cv_matches
+from matching.models import VacancyCatalogGeneration
+from vacancy.models import Vacancy
+from vacancy.services import filter_vacancies
+
+logger = logging.getLogger(__name__)
+
+# Стан процесу-воркера: знімок ознак вакансій завантажується один раз при старті.
+_catalog = None
+_rows_by_vacancy_id = None
+
+
+def _init_worker():
+    global _catalog, _rows_by_vacancy_id
+    django.setup()
+    _catalog = VacancyCatalog(Vacancy.objects.order_by('id'))
+    _rows_by_vacancy_id = {vacancy_id: row for row, vacancy_id in enumerate(_catalog.ids)}
+
+
+def _rematch_chunk(cv_ids):
+    stored = failed = 0
+    cvs = CV.objects.filter(pk__in=cv_ids).select_related('work_options').prefetch_related('skills', 'languages')
+    for user_cv in cvs:
+        try:
+            features = cv_matching_features(user_cv)
+            candidate_ids = filter_vacancies(features, user_cv.id).values_list('id', flat=True)
+            rows, missing_ids = [], []
+            for vacancy_id in candidate_ids:
+                if vacancy_id in _rows_by_vacancy_id:
+                    rows.append(_rows_by_vacancy_id[vacancy_id])
+                else:
+                    missing_ids.append(vacancy_id)
+            rows.sort()
+            scores = _catalog.score(features) if rows else None
+            # Вакансії, створені після знімка, рахує rematch_vacancy - їхні збіги не видаляються.
+            stored += store_cv_matches(user_cv, _catalog, scores, rows=rows, keep_vacancy_ids=missing_ids)
+        except Exception as e:
+            failed += 1
+            logger.error(f"Помилка перерахунку збігів для резюме {user_cv.id}: {e}", exc_info=True)
+    return len(cv_ids), stored, failed
+
+
+class Command(BaseCommand):
+    help = "Перераховує збіги вакансій для всіх проаналізованих резюме паралельно в кількох процесах."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Кількість процесів-воркерів.")
+        parser.add_argument('--chunk-size', type=int, default=200, help="Кількість резюме в одному завданні воркера.")
+        parser.add_argument('--since', help="Пропустити резюме, збіги яких уже перераховано після цього моменту "
+                                            "(ISO 8601). Використовується для продовження перерваного запуску.")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        chunk_size = options['chunk_size']
+        if workers < 1 or chunk_size < 1:
+            raise CommandError("--workers і --chunk-size мають бути додатними.")
+
+        if options['since']:
+            started = parse_datetime(options['since'])
+            if started is None:
+                raise CommandError(f"Некоректна дата --since: {options['since']}")
+            if timezone.is_naive(started):
+                started = timezone.make_aware(started)
+        else:
+            started = timezone.now()
+
+        cv_ids = [
+            cv_id for cv_id, matched_at in latest_analyzed_cvs().values_list('id', 'matched_at')
+            if matched_at is None or matched_at < started
+        ]
+        total = len(cv_ids)
+        self.stdout.write(f"Резюме до перерахунку: {total}. Воркерів: {workers}.")
+        self.stdout.write(f"Щоб продовжити після переривання: manage.py rematch_all --since {started.isoformat()}")
+        if not total:
+            return
+
+        chunks = [cv_ids[i:i + chunk_size] for i in range(0, total, chunk_size)]
+        processed = stored = failed = 0
+
+        # Відкриті з'єднання не можна успадковувати дочірнім процесам.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = [executor.submit(_rematch_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                chunk_processed, chunk_stored, chunk_failed = future.result()
+                processed += chunk_processed
+                stored += chunk_stored
+                failed += chunk_failed
+                self.stdout.write(f"Оброблено {processed}/{total} резюме, збережено {stored} збігів, "
+                                  f"помилок: {failed}.")
+
+        VacancyCatalogGeneration.bump()
+        if failed:
+            self.stdout.write(self.style.WARNING(f"Перерахунок завершено з помилками для {failed} резюме."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Збіги перераховано для {processed} резюме."))
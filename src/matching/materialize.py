@@ -0,0 +1,145 @@
+import logging
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cvs.models import CV
+from matching.candidates import cv_catalog_cache
+from matching.engine import VacancyCatalog, match_quality_for
+from matching.features import cv_matching_features
+from matching.models import Match
+from matching.service import MATCHING_BACKEND
+from matching.sql_backend import build_match_objects_sql
+from vacancy.services import filter_vacancies
+
+logger = logging.getLogger(__name__)
+
+MATCH_UPDATE_FIELDS = ['score', 'skills_match', 'location_match', 'salary_match', 'level_match', 'match_quality']
+MATCH_BATCH_SIZE = 1000
+
+
+def build_match_objects(user_id, catalog, scores, rows=None):
+    if rows is None:
+        rows = range(len(catalog))
+    total, skills, location, salary, level = (scores[key] for key in
+                                              ('score', 'skills_match', 'location_match', 'salary_match',
+                                               'level_match'))
+    return [
+        Match(
+            user_id=user_id,
+            vacancy_id=catalog.ids[row],
+            score=int(total[row]),
+            skills_match=int(skills[row]),
+            location_match=int(location[row]),
+            salary_match=int(salary[row]),
+            level_match=int(level[row]),
+            match_quality=match_quality_for(int(total[row])),
+        )
+        for row in rows
+    ]
+
+
+def upsert_matches(matches):
+    Match.objects.bulk_create(
+        matches,
+        batch_size=MATCH_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user', 'vacancy'],
+        update_fields=MATCH_UPDATE_FIELDS,
+    )
+
+
+# replace=True видаляє збіги, яких немає серед нових. Якщо каталог - знімок, у якому немає частини
+# вакансій-кандидатів (створених після нього), їхні ID передаються в keep_vacancy_ids, щоб не стерти чинні збіги.
+def store_cv_matches(user_cv, catalog, scores, replace=True, rows=None, keep_vacancy_ids=()):
+    if rows is None:
+        rows = range(len(catalog))
+    matches = build_match_objects(user_cv.user_id, catalog, scores, rows) if len(rows) else []
+    return save_cv_matches(user_cv, matches, replace=replace, keep_vacancy_ids=keep_vacancy_ids)
+
+
+def save_cv_matches(user_cv, matches, replace=True, keep_vacancy_ids=()):
+    with transaction.atomic():
+        if replace:
+            keep = [match.vacancy_id for match in matches]
+            keep.extend(keep_vacancy_ids)
+            Match.objects.filter(user_id=user_cv.user_id).exclude(vacancy_id__in=keep).delete()
+        upsert_matches(matches)
+        if replace:
+            matched_at = timezone.now()
+            CV.objects.filter(pk=user_cv.pk).update(matched_at=matched_at)
+            user_cv.matched_at = matched_at
+    return len(matches)
+
+
+def matches_are_stale(user_cv):
+    return user_cv.matched_at is None or user_cv.matched_at < user_cv.updated_at
+
+
+def rematch_cv(user_cv):
+    features = cv_matching_features(user_cv)
+    vacancies = filter_vacancies(features, user_cv.id)
+    if MATCHING_BACKEND == 'sql':
+        stored = save_cv_matches(user_cv, build_match_objects_sql(user_cv.user_id, features, vacancies))
+    else:
+        catalog = VacancyCatalog(vacancies)
+        scores = catalog.score(features) if len(catalog) else None
+        stored = store_cv_matches(user_cv, catalog, scores)
+    logger.info(f"Матеріалізовано {stored} збігів для резюме {user_cv.id} користувача {user_cv.user_id}.")
+    return stored
+
+
+# Одна вакансія проти матриці ознак резюме: фільтри 1-6 перевіряє CVCatalog.accepts, а не окремий запит на резюме.
+def rematch_vacancy(vacancy):
+    catalog = cv_catalog_cache.get()
+    if not len(catalog):
+        return 0
+    scores = catalog.score(vacancy)
+    total, skills, location, salary, level = (scores[key] for key in
+                                              ('score', 'skills_match', 'location_match', 'salary_match',
+                                               'level_match'))
+    matches = [
+        Match(
+            user_id=catalog.user_ids[row],
+            vacancy_id=vacancy.id,
+            score=int(total[row]),
+            skills_match=int(skills[row]),
+            location_match=int(location[row]),
+            salary_match=int(salary[row]),
+            level_match=int(level[row]),
+            match_quality=match_quality_for(int(total[row])),
+        )
+        for row in np.flatnonzero(catalog.accepts(vacancy))
+    ]
+
+    upsert_matches(matches)
+    logger.info(f"Матеріалізовано {len(matches)} збігів для нової вакансії {vacancy.id}.")
+    return len(matches)
+
+
+def read_ranked_matches(user_id, limit=None, min_score=None, after=None):
+    matches = Match.objects.filter(user_id=user_id)
+    if min_score is not None:
+        matches = matches.filter(score__gte=min_score)
+    if after is not None:
+        after_score, after_id = after
+        matches = matches.filter(Q(score__lt=after_score) | Q(score=after_score, vacancy_id__gt=after_id))
+    matches = matches.order_by('-score', 'vacancy_id').values_list(
+        'vacancy_id', 'vacancy__title', 'score', 'match_quality', 'skills_match', 'location_match', 'salary_match')
+    if limit is not None:
+        matches = matches[:limit]
+
+    return [
+        {
+            'vacancy_id': vacancy_id,
+            'title': title,
+            'score': int(score),
+            'match_quality': match_quality,
+            'skills_match': int(skills),
+            'location_match': int(location),
+            'salary_match': int(salary),
+        }
+        for vacancy_id, title, score, match_quality, skills, location, salary in matches
+    ]
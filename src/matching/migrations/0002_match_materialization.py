@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0001_initial'),
+        ('vacancy', '0017_vacancy_matching_features'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='level_match',
+            field=models.FloatField(default=0, help_text='Відсоток співпадіння рівня'),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='languages_match',
+            field=models.FloatField(default=0, help_text='Відсоток співпадіння мов'),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='responsibilities_match',
+            field=models.FloatField(default=0, help_text="Відсоток співпадіння обов'язків"),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='tools_match',
+            field=models.FloatField(default=0, help_text='Відсоток співпадіння інструментів'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['user', '-score', 'vacancy'], name='match_user_score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(fields=('user', 'vacancy'), name='match_user_vacancy_unique'),
+        ),
+    ]
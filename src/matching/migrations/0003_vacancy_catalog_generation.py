@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0002_match_materialization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyCatalogGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0, help_text='Номер покоління каталогу вакансій')),
+            ],
+        ),
+    ]
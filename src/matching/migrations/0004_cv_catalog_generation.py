@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0003_vacancy_catalog_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVCatalogGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0, help_text='Номер покоління каталогу')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AlterField(
+            model_name='vacancycataloggeneration',
+            name='value',
+            field=models.BigIntegerField(default=0, help_text='Номер покоління каталогу'),
+        ),
+    ]
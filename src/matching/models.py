@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models import F
 from users.models import User
 from vacancy.models import Vacancy
 
@@ -8,13 +9,22 @@ class Match(models.Model):
     vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name='matches')
     score = models.FloatField(help_text="Загальний відсоток співпадіння")
     skills_match = models.FloatField(help_text="Відсоток співпадіння навичок")
-    tools_match = models.FloatField(help_text="Відсоток співпадіння інструментів")
-    responsibilities_match = models.FloatField(help_text="Відсоток співпадіння обов'язків")
-    languages_match = models.FloatField(help_text="Відсоток співпадіння мов")
+    tools_match = models.FloatField(default=0, help_text="Відсоток співпадіння інструментів")
+    responsibilities_match = models.FloatField(default=0, help_text="Відсоток співпадіння обов'язків")
+    languages_match = models.FloatField(default=0, help_text="Відсоток співпадіння мов")
     location_match = models.FloatField(help_text="Відсоток співпадіння локації")
     salary_match = models.FloatField(help_text="Відсоток співпадіння зарплати")
+    level_match = models.FloatField(default=0, help_text="Відсоток співпадіння рівня")
     match_quality = models.CharField(max_length=20, help_text="Якість співпадіння (Low, Medium, High)")
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'vacancy'], name='match_user_vacancy_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-score', 'vacancy'], name='match_user_score_idx'),
+        ]
+
     def __str__(self):
         return f"Match {self.user} - {self.vacancy} ({self.score:.2f}%)"
 
@@ -26,3 +36,35 @@ class Match(models.Model):
         else:
             self.match_quality = 'Low'
         super().save(*args, **kwargs)
+
+
+# Лічильник змін каталогу в одному рядку (pk=1): кеші процесів порівнюють з ним своє покоління одним запитом.
+# Він завжди читається з основної бази: покоління з репліки, що відстає, підтвердило б застарілі кеші та індекс.
+class CatalogGeneration(models.Model):
+    value = models.BigIntegerField(default=0, help_text="Номер покоління каталогу")
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def current(cls):
+        return cls.objects.using(DEFAULT_DB_ALIAS).filter(pk=1).values_list('value', flat=True).first() or 0
+
+    # Повертає нове покоління. UPDATE блокує рядок до кінця транзакції, тож записи, зроблені в тій самій
+    # транзакції, стають видимими разом із поколінням, а покоління видаються по одному.
+    @classmethod
+    def bump(cls):
+        with transaction.atomic():
+            if not cls.objects.filter(pk=1).update(value=F('value') + 1):
+                row, created = cls.objects.get_or_create(pk=1, defaults={'value': 1})
+                if not created:
+                    cls.objects.filter(pk=1).update(value=F('value') + 1)
+            return cls.objects.using(DEFAULT_DB_ALIAS).filter(pk=1).values_list('value', flat=True).get()
+
+
+class VacancyCatalogGeneration(CatalogGeneration):
+    pass
+
+
+class CVCatalogGeneration(CatalogGeneration):
+    pass
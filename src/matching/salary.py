@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+EXCHANGE_RATES = {
+    'USD': 1.0,
+    'EUR': 0.92,
+    'UAH': 41.0,
+}
+
+
+def get_exchange_rate(currency_code):
+    if not currency_code:
+        return None
+    return EXCHANGE_RATES.get(currency_code.upper())
+
+
+def normalize_salary(salary_min, salary_max, currency):
+    if salary_min is None and salary_max is None:
+        return None, None
+    rate = get_exchange_rate(currency)
+    if rate is None or rate == 0:
+        return None, None
+    norm_min = Decimal(salary_min) / Decimal(rate) if salary_min is not None else None
+    norm_max = Decimal(salary_max) / Decimal(rate) if salary_max is not None else None
+    return norm_min, norm_max
+
+
+def check_salary_overlap(cv_min, cv_max, v_min, v_max):
+    if cv_min is None and cv_max is None:
+        return True
+    if v_min is None and v_max is None:
+        return True
+    left = max(cv_min or Decimal('-Infinity'), v_min or Decimal('-Infinity'))
+    right = min(cv_max or Decimal('Infinity'), v_max or Decimal('Infinity'))
+    return left <= right
@@ -0,0 +1,124 @@
+from django.db.models import Case, F, FloatField, Func, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from matching.engine import MATCH_WEIGHTS, CVProfile, match_quality_for
+from matching.models import Match
+from vacancy.models import Vacancy
+
+SCORE_FIELDS = ['score_total', 'score_skills', 'score_location', 'score_salary', 'score_level']
+
+
+# Арифметика у float8, як у NumPy, щоб round() (half-even для double precision) давав ті самі цілі.
+def _float(expression):
+    return Cast(expression, FloatField())
+
+
+def _round(expression):
+    return Func(expression, function='round', output_field=FloatField())
+
+
+def _int(value):
+    return Value(value, output_field=IntegerField())
+
+
+# skills_normalized не містить дублікатів, тож кількість його елементів зі списку резюме = |перетин|.
+def _skills_expression(profile):
+    column = f'"{Vacancy._meta.db_table}"."skills_normalized"'
+    intersection = RawSQL(
+        f"(SELECT count(*) FROM unnest({column}) AS vacancy_skill(term) WHERE vacancy_skill.term = ANY(%s))",
+        (sorted(profile.skills),),
+        output_field=IntegerField(),
+    )
+    size = Func(F('skills_normalized'), function='cardinality', output_field=IntegerField())
+    union = Func(size + _int(len(profile.skills)) - intersection, _int(0), function='NULLIF',
+                 output_field=IntegerField())
+    ratio = _round(_float(intersection) / _float(union) * _float(_int(100)))
+    return Case(When(Q(skills_normalized__len__gt=0), then=Cast(ratio, IntegerField())), default=_int(0))
+
+
+def _location_expression(profile):
+    if profile.cities:
+        conditions = [When(cities_normalized__overlap=sorted(profile.cities), then=_int(100))]
+        if profile.countries:
+            conditions.append(When(countries_normalized__overlap=sorted(profile.countries), then=_int(70)))
+        fallback = Case(*conditions, default=_int(0))
+    elif profile.is_remote is None:
+        fallback = _int(50)
+    else:
+        fallback = _int(0)
+
+    if profile.is_remote:
+        return Case(When(Q(is_remote=True) | Q(is_hybrid=True), then=_int(100)), default=fallback)
+    return fallback
+
+
+def _salary_expression(profile):
+    if profile.salary_range is None:
+        return _int(100)
+    return Case(
+        When(salary_range_base__isnull=True, then=_int(100)),
+        When(salary_range_base__overlap=profile.salary_range, then=_int(100)),
+        default=_int(0),
+    )
+
+
+def _level_expression(profile):
+    if profile.level is None:
+        return _int(100)
+    conditions = [
+        When(level_normalized__isnull=True, then=_int(100)),
+        When(level_normalized=profile.level, then=_int(100)),
+    ]
+    if profile.level_rank < 0:
+        return Case(*conditions, default=_int(50))
+
+    rank = profile.level_rank
+    conditions += [
+        When(level_rank__isnull=True, then=_int(50)),
+        When(level_rank=rank, then=_int(100)),
+        When(level_rank=rank + 1, then=_int(70)),
+        When(level_rank__gt=rank + 1, then=_int(30)),
+        When(level_rank=rank - 1, then=_int(90)),
+    ]
+    return Case(*conditions, default=_int(70))
+
+
+def annotate_scores(vacancies_queryset, cv_features):
+    profile = cv_features if isinstance(cv_features, CVProfile) else CVProfile(cv_features)
+    vacancies = vacancies_queryset.annotate(
+        score_skills=_skills_expression(profile),
+        score_location=_location_expression(profile),
+        score_salary=_salary_expression(profile),
+        score_level=_level_expression(profile),
+    )
+
+    def weighted(field, weight):
+        return _float(F(field)) / _float(_int(100)) * _float(Value(MATCH_WEIGHTS[weight]))
+
+    total = (
+        weighted('score_skills', 'skills') +
+        weighted('score_location', 'location') +
+        weighted('score_salary', 'salary') +
+        weighted('score_level', 'level')
+    ) * _float(_int(100))
+    return vacancies.annotate(score_total=Cast(_round(total), IntegerField()))
+
+
+# Рядки Match для матеріалізації (matching.materialize.rematch_cv при MATCHING_BACKEND='sql'): оцінки всіх
+# вакансій рахуються одним запитом у Postgres, без завантаження каталогу в пам'ять.
+def build_match_objects_sql(user_id, cv_features, vacancies_queryset):
+    vacancies = annotate_scores(vacancies_queryset, cv_features).values_list('id', *SCORE_FIELDS)
+    return [
+        Match(
+            user_id=user_id,
+            vacancy_id=vacancy_id,
+            score=score,
+            skills_match=skills,
+            location_match=location,
+            salary_match=salary,
+            level_match=level,
+            match_quality=match_quality_for(score),
+        )
+        for vacancy_id, score, skills, location, salary, level in vacancies
+    ]
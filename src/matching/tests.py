@@ -0,0 +1,373 @@
+import random
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+import numpy as np
+
+from cvs.models import CV, Language, Skill, WorkOptions
+from matching.cache import MATCH_CACHE_ALIAS, get_ranked_matches
+from matching.candidates import cv_catalog_cache, rank_candidates_for_vacancy
+from matching.engine import CVCatalog, VacancyCatalog, select_top
+from matching.features import cv_matching_features, salary_base_range, vacancy_matching_features
+from matching.materialize import rematch_cv, rematch_vacancy, store_cv_matches
+from matching.models import CVCatalogGeneration, Match
+from matching.salary import check_salary_overlap, normalize_salary
+from matching.sql_backend import annotate_scores
+from vacancy.index import VacancyIndex
+from vacancy.models import Vacancy
+from vacancy.services import filter_vacancies, get_filtered_vacancies
+
+User = get_user_model()
+
+CURRENCIES = ['USD', 'EUR', 'UAH', 'usd', 'GBP', '', None]
+SALARIES = [None, 0, 1, 920, 1000, 1086, 1087, 2500, 41000, 100000]
+SKILLS = ['Python', 'python ', 'Django', 'SQL', 'Go', 'React', 'Docker']
+CITIES = ['Kyiv', 'kyiv', 'Lviv', 'Berlin']
+COUNTRIES = ['Ukraine', 'Germany', 'Poland']
+CATEGORIES = ['IT', 'Design', 'Sales']
+LEVELS = [None, '', 'Junior', 'middle', 'Senior ', 'lead', 'Guru']
+LANGUAGES = ['English', 'German']
+LANGUAGE_LEVELS = [None, 'B2', 'C1']
+FLAGS = [None, True, False]
+
+
+def create_vacancy(**fields):
+    fields.setdefault('title', 'Vacancy')
+    fields.setdefault('categories', ['IT'])
+    return Vacancy.objects.create(**fields, **vacancy_matching_features(fields))
+
+
+def random_salary(rng):
+    return {
+        'salary_min': rng.choice(SALARIES),
+        'salary_max': rng.choice(SALARIES),
+        'salary_currency': rng.choice(CURRENCIES),
+    }
+
+
+def random_languages(rng):
+    return [{'language': rng.choice(LANGUAGES), 'level': rng.choice(LANGUAGE_LEVELS)}
+            for _ in range(rng.randint(0, 2))]
+
+
+def random_vacancy(rng):
+    return create_vacancy(
+        categories=rng.sample(CATEGORIES, rng.randint(1, 2)),
+        skills=rng.sample(SKILLS, rng.randint(0, 4)),
+        cities=rng.sample(CITIES, rng.randint(0, 2)),
+        countries=rng.sample(COUNTRIES, rng.randint(0, 2)),
+        is_remote=rng.choice(FLAGS),
+        is_hybrid=rng.choice(FLAGS),
+        level=rng.choice(LEVELS),
+        languages=random_languages(rng),
+        **random_salary(rng),
+    )
+
+
+def random_cv_features(rng):
+    return {
+        'skills': rng.sample(SKILLS, rng.randint(0, 4)),
+        'languages': random_languages(rng),
+        'level': rng.choice(LEVELS),
+        'categories': rng.sample(CATEGORIES, rng.randint(0, 2)),
+        'countries': rng.sample(COUNTRIES, rng.randint(0, 2)),
+        'cities': rng.sample(CITIES, rng.randint(0, 2)),
+        'is_office': None,
+        'is_remote': rng.choice(FLAGS),
+        'is_hybrid': None,
+        'willing_to_relocate': rng.choice(FLAGS),
+        **random_salary(rng),
+    }
+
+
+# calculate_vacancy_matches_for_cv до векторизації - еталон, з яким порівнюються всі рушії.
+def baseline_scores(cv, vacancy):
+    cv = SimpleNamespace(**cv)
+    cv_skills_set = set(s.lower().strip() for s in (cv.skills or []) if s)
+    cv_cities_set = set(c.lower().strip() for c in (cv.cities or []) if c)
+    cv_countries_set = set(co.lower().strip() for co in (cv.countries or []) if co)
+
+    skills_score = 0
+    vacancy_skills_set = set(s.lower().strip() for s in (vacancy.skills or []) if s)
+    if vacancy_skills_set:
+        union = cv_skills_set | vacancy_skills_set
+        skills_score = round(len(cv_skills_set & vacancy_skills_set) / len(union) * 100)
+
+    location_score = 0
+    if cv.is_remote and (vacancy.is_remote or vacancy.is_hybrid):
+        location_score = 100
+    elif cv_cities_set:
+        if cv_cities_set & set(c.lower().strip() for c in (vacancy.cities or []) if c):
+            location_score = 100
+        elif cv_countries_set and cv_countries_set & set(c.lower().strip() for c in (vacancy.countries or []) if c):
+            location_score = 70
+    elif cv.is_remote is None:
+        location_score = 50
+
+    cv_min, cv_max = normalize_salary(cv.salary_min, cv.salary_max, cv.salary_currency)
+    v_min, v_max = normalize_salary(vacancy.salary_min, vacancy.salary_max, vacancy.salary_currency)
+    salary_score = 100 if check_salary_overlap(cv_min, cv_max, v_min, v_max) else 0
+    if (cv.salary_min is None and cv.salary_max is None) or \
+            (vacancy.salary_min is None and vacancy.salary_max is None):
+        salary_score = 100
+
+    level_score = 100
+    if cv.level and vacancy.level:
+        cv_level, v_level = cv.level.lower().strip(), vacancy.level.lower().strip()
+        if cv_level != v_level:
+            hierarchy = ['intern', 'junior', 'middle', 'senior', 'lead', 'director']
+            if cv_level in hierarchy and v_level in hierarchy:
+                diff = hierarchy.index(v_level) - hierarchy.index(cv_level)
+                level_score = {0: 100, 1: 70, -1: 90}.get(diff, 30 if diff > 1 else 70)
+            else:
+                level_score = 50
+
+    total = round(((skills_score / 100.0) * 0.5 + (location_score / 100.0) * 0.2 +
+                   (salary_score / 100.0) * 0.2 + (level_score / 100.0) * 0.1) * 100)
+    return {'score': total, 'skills_match': skills_score, 'location_match': location_score,
+            'salary_match': salary_score, 'level_match': level_score}
+
+
+def engine_scores(scores, row):
+    return {key: int(values[row]) for key, values in scores.items()}
+
+
+def create_cv(username, skills=(), languages=(), **fields):
+    user = User.objects.create(username=username, email=f"{username}@example.com")
+    work_options = WorkOptions.objects.create(
+        cities=fields.pop('cities', []), countries=fields.pop('countries', []),
+        is_remote=fields.pop('is_remote', None), willing_to_relocate=fields.pop('willing_to_relocate', None))
+    cv = CV.objects.create(user=user, work_options=work_options, analyzed=True, **fields)
+    Skill.objects.bulk_create([Skill(cv=cv, name=name) for name in skills])
+    Language.objects.bulk_create([Language(cv=cv, name=name, level=level) for name, level in languages])
+    return cv
+
+
+class SelectTopTests(SimpleTestCase):
+    def test_partial_selection_matches_full_sort(self):
+        rng = np.random.default_rng(7)
+        total = rng.integers(0, 5, size=200)
+        ids = rng.permutation(np.arange(1000, 1200))
+        mask = rng.random(200) < 0.8
+        expected = sorted(np.flatnonzero(mask), key=lambda row: (-total[row], ids[row]))
+        for limit in (0, 1, 7, 150, 500, None):
+            self.assertEqual(select_top(total, ids, limit=limit, mask=mask), expected[:limit])
+        after = (int(total[expected[10]]), int(ids[expected[10]]))
+        self.assertEqual(select_top(total, ids, limit=5, after=after, mask=mask), expected[11:16])
+
+
+class SalaryRangeTests(TestCase):
+    def test_range_keeps_normalize_salary_decimals(self):
+        salary_range = salary_base_range(920, 1000, 'EUR')
+        self.assertEqual(salary_range.lower, Decimal(920) / Decimal(0.92))
+        self.assertEqual(salary_range.upper, Decimal(1000) / Decimal(0.92))
+
+    def test_zero_bounds_are_open_and_inverted_range_is_empty(self):
+        self.assertIsNone(salary_base_range(None, None, 'USD'))
+        self.assertIsNone(salary_base_range(1000, 2000, 'GBP'))
+        open_range = salary_base_range(0, 0, 'USD')
+        self.assertIsNone(open_range.lower)
+        self.assertIsNone(open_range.upper)
+        self.assertFalse(open_range.isempty)
+        self.assertTrue(salary_base_range(2000, 1000, 'USD').isempty)
+
+    def test_engine_sql_and_filter_match_baseline(self):
+        rng = random.Random(20261017)
+        vacancies = [create_vacancy(**random_salary(rng)) for _ in range(120)]
+        vacancies.append(create_vacancy(salary_min=1000, salary_max=1000, salary_currency='USD'))
+        vacancies.append(create_vacancy(salary_min=920, salary_max=920, salary_currency='EUR'))
+        catalog = VacancyCatalog(Vacancy.objects.order_by('id'))
+        edge_cvs = [
+            {'salary_min': 1000, 'salary_max': 1000, 'salary_currency': 'USD'},
+            {'salary_min': 920, 'salary_max': 920, 'salary_currency': 'EUR'},
+            {'salary_min': 0, 'salary_max': 0, 'salary_currency': 'USD'},
+            {'salary_min': 2000, 'salary_max': 1000, 'salary_currency': 'UAH'},
+        ]
+        cvs = [{**random_cv_features(rng), **salary} for salary in edge_cvs + [random_salary(rng) for _ in range(60)]]
+
+        for cv in cvs:
+            expected = {v.id: baseline_scores(cv, v)['salary_match'] for v in vacancies}
+
+            scores = catalog.score(cv)['salary_match']
+            self.assertEqual(dict(zip(catalog.ids, scores.tolist())), expected, cv)
+
+            sql_scores = dict(annotate_scores(Vacancy.objects.all(), cv).values_list('id', 'score_salary'))
+            self.assertEqual(sql_scores, expected, cv)
+
+            salary_range = salary_base_range(cv['salary_min'], cv['salary_max'], cv['salary_currency'])
+            filtered = Vacancy.objects.all()
+            if salary_range is not None:
+                filtered = filtered.filter(Q(salary_range_base__overlap=salary_range) |
+                                           Q(salary_range_base__isnull=True))
+            self.assertEqual(set(filtered.values_list('id', flat=True)),
+                             {vacancy_id for vacancy_id, score in expected.items() if score == 100}, cv)
+
+
+@mock.patch.object(VacancyIndex, '_rebuild_in_background')
+class ForwardReverseParityTests(TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.vacancies = [random_vacancy(rng) for _ in range(80)]
+        self.features = [random_cv_features(rng) for _ in range(80)]
+        self.cv_catalog = CVCatalog((n, n, features) for n, features in enumerate(self.features))
+
+    def test_forward_and_reverse_scores_match_baseline(self, rebuild_in_background):
+        vacancy_catalog = VacancyCatalog(Vacancy.objects.order_by('id'))
+        reverse = {vacancy.id: self.cv_catalog.score(vacancy) for vacancy in self.vacancies}
+        for n, features in enumerate(self.features):
+            forward = vacancy_catalog.score(features)
+            for row, vacancy in enumerate(self.vacancies):
+                expected = baseline_scores(features, vacancy)
+                self.assertEqual(engine_scores(forward, row), expected, (features, vacancy.id))
+                self.assertEqual(engine_scores(reverse[vacancy.id], n), expected, (features, vacancy.id))
+
+    def test_reverse_mask_matches_forward_filters(self, rebuild_in_background):
+        accepted = {vacancy.id: self.cv_catalog.accepts(vacancy) for vacancy in self.vacancies}
+        matched = 0
+        for n, features in enumerate(self.features):
+            forward = set(filter_vacancies(features).values_list('id', flat=True))
+            reverse = {vacancy_id for vacancy_id, mask in accepted.items() if mask[n]}
+            self.assertEqual(reverse, forward, features)
+            matched += len(forward)
+        self.assertGreater(matched, 0)
+
+
+@mock.patch.object(VacancyIndex, '_rebuild_in_background')
+class CVFeaturesTests(TestCase):
+    def test_features_come_from_related_rows(self, rebuild_in_background):
+        cv = create_cv('alice', skills=['Python', 'SQL'], languages=[('English', 'B2')], cities=['Kyiv'],
+                       is_remote=True, salary_min=1000, salary_max=2000, salary_currency='USD')
+        features = cv_matching_features(cv)
+        self.assertEqual(sorted(features['skills']), ['Python', 'SQL'])
+        self.assertEqual(features['languages'], [{'language': 'English', 'level': 'B2'}])
+        self.assertEqual(features['cities'], ['Kyiv'])
+        self.assertTrue(features['is_remote'])
+        self.assertEqual(features['categories'], [])
+
+    def test_stored_cv_without_categories_gets_vacancies(self, rebuild_in_background):
+        vacancy = create_vacancy(skills=['Python'])
+        create_vacancy(skills=['Go'])
+        cv = create_cv('bob', skills=['Python'])
+        with mock.patch('vacancy.services.logger') as logger:
+            self.assertEqual(list(get_filtered_vacancies(cv)), [vacancy])
+        logger.error.assert_not_called()
+
+
+class CandidatesTests(TestCase):
+    def setUp(self):
+        cv_catalog_cache.invalidate()
+        self.python = create_cv('python-dev', skills=['Python', 'Django'], cities=['Kyiv'])
+        self.go = create_cv('go-dev', skills=['Go'], cities=['Kyiv'])
+        self.far = create_cv('far-dev', skills=['Python'], cities=['Berlin'], willing_to_relocate=True)
+        self.vacancy = create_vacancy(skills=['Python', 'Django'], cities=['Kyiv'])
+
+    def test_reverse_results_pass_forward_filters(self):
+        candidates = rank_candidates_for_vacancy(self.vacancy)
+        self.assertEqual([c['cv_id'] for c in candidates], [self.python.id])
+
+    def test_catalog_is_reused_until_generation_changes(self):
+        catalog = cv_catalog_cache.get()
+        with self.assertNumQueries(1):
+            self.assertIs(cv_catalog_cache.get(), catalog)
+        CVCatalogGeneration.bump()
+        self.assertIsNot(cv_catalog_cache.get(), catalog)
+
+
+@mock.patch.object(VacancyIndex, '_rebuild_in_background')
+class MaterializeTests(TestCase):
+    def setUp(self):
+        cv_catalog_cache.invalidate()
+        self.cvs = [create_cv(f'dev-{n}', skills=['Python', 'SQL'][:n % 2 + 1], cities=['Kyiv'],
+                              salary_min=1000 * n, salary_max=1000 * n + 500, salary_currency='USD')
+                    for n in range(6)]
+        self.go = create_cv('go-dev', skills=['Go'], cities=['Kyiv'])
+
+    def _rows(self, **lookup):
+        return set(Match.objects.filter(**lookup).values_list(
+            'user_id', 'vacancy_id', 'score', 'skills_match', 'location_match', 'salary_match', 'level_match'))
+
+    def test_rematch_vacancy_matches_rematch_cv_with_constant_queries(self, rebuild_in_background):
+        cv_catalog_cache.get()
+        vacancy = create_vacancy(skills=['Python'], cities=['Kyiv'])
+        with self.assertNumQueries(2):
+            self.assertEqual(rematch_vacancy(vacancy), len(self.cvs))
+        reverse = self._rows(vacancy=vacancy)
+        self.assertNotIn(self.go.user_id, {row[0] for row in reverse})
+
+        Match.objects.all().delete()
+        for user_cv in self.cvs + [self.go]:
+            rematch_cv(user_cv)
+        self.assertEqual(self._rows(), reverse)
+
+    def test_sql_backend_materializes_the_same_matches(self, rebuild_in_background):
+        rng = random.Random(7)
+        for _ in range(30):
+            random_vacancy(rng)
+        for user_cv in self.cvs + [self.go]:
+            rematch_cv(user_cv)
+        expected = self._rows()
+        self.assertTrue(expected)
+
+        Match.objects.all().delete()
+        with mock.patch('matching.materialize.MATCHING_BACKEND', 'sql'), \
+                mock.patch('matching.materialize.VacancyCatalog') as vacancy_catalog:
+            for user_cv in self.cvs + [self.go]:
+                rematch_cv(user_cv)
+        vacancy_catalog.assert_not_called()
+        self.assertEqual(self._rows(), expected)
+
+    def test_partial_rematch_keeps_matches_of_vacancies_outside_snapshot(self, rebuild_in_background):
+        user_cv = self.cvs[0]
+        old = create_vacancy(skills=['Python'], cities=['Kyiv'])
+        catalog = VacancyCatalog(Vacancy.objects.filter(pk=old.pk))
+        new = create_vacancy(skills=['Python'], cities=['Kyiv'])
+        rematch_vacancy(new)
+        stale = create_vacancy(skills=['Rust'])
+        Match.objects.create(user_id=user_cv.user_id, vacancy=stale, score=1, skills_match=0, location_match=0,
+                             salary_match=0, level_match=0)
+
+        store_cv_matches(user_cv, catalog, catalog.score(cv_matching_features(user_cv)), keep_vacancy_ids=[new.id])
+        self.assertEqual(set(Match.objects.filter(user_id=user_cv.user_id).values_list('vacancy_id', flat=True)),
+                         {old.id, new.id})
+
+
+class RankedMatchesCacheTests(TestCase):
+    def setUp(self):
+        caches[MATCH_CACHE_ALIAS].clear()
+        self.cv = create_cv('ranked', skills=['Python'])
+        CV.objects.filter(pk=self.cv.pk).update(matched_at=timezone.now())
+        self.cv.refresh_from_db()
+        self.vacancies = [create_vacancy(title=f'V{n}') for n in range(5)]
+        for n, vacancy in enumerate(self.vacancies):
+            score = [90, 70, 70, 40, 10][n]
+            Match.objects.create(user_id=self.cv.user_id, vacancy=vacancy, score=score, skills_match=score,
+                                 location_match=0, salary_match=0, level_match=0)
+
+    def _ids(self, matches):
+        return [match['vacancy_id'] for match in matches]
+
+    def test_pages_follow_keyset_order_and_are_cached_per_page(self):
+        ids = [vacancy.id for vacancy in self.vacancies]
+        first = get_ranked_matches(self.cv, limit=2)
+        self.assertEqual(self._ids(first), ids[:2])
+        second = get_ranked_matches(self.cv, limit=2, after=(first[-1]['score'], first[-1]['vacancy_id']))
+        self.assertEqual(self._ids(second), ids[2:4])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_ranked_matches(self.cv, limit=2), first)
+        self.assertEqual(self._ids(get_ranked_matches(self.cv, min_score=50)), ids[:3])
+
+    def test_long_unpaginated_list_is_not_cached(self):
+        with mock.patch('matching.cache.MATCH_CACHE_MAX_ROWS', 3):
+            self.assertEqual(len(get_ranked_matches(self.cv)), 5)
+            with self.assertNumQueries(3):
+                get_ranked_matches(self.cv)
+            self.assertEqual(len(get_ranked_matches(self.cv, limit=3)), 3)
+            with self.assertNumQueries(1):
+                get_ranked_matches(self.cv, limit=3)
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+OPENAPI_AI_TIMEOUT = getattr(settings, 'OPENAPI_AI_TIMEOUT', 60)
+OPENAPI_AI_CONNECT_TIMEOUT = getattr(settings, 'OPENAPI_AI_CONNECT_TIMEOUT', 5)
+OPENAPI_AI_POOL_SIZE = getattr(settings, 'OPENAPI_AI_POOL_SIZE', 10)
+OPENAPI_AI_MAX_RETRIES = getattr(settings, 'OPENAPI_AI_MAX_RETRIES', 3)
+OPENAPI_AI_BACKOFF_BASE = getattr(settings, 'OPENAPI_AI_BACKOFF_BASE', 0.5)
+OPENAPI_AI_BACKOFF_MAX = getattr(settings, 'OPENAPI_AI_BACKOFF_MAX', 8)
+OPENAPI_AI_FAILURE_THRESHOLD = getattr(settings, 'OPENAPI_AI_FAILURE_THRESHOLD', 5)
+OPENAPI_AI_RECOVERY_TIMEOUT = getattr(settings, 'OPENAPI_AI_RECOVERY_TIMEOUT', 30)
+# Максимальна кількість одночасних асинхронних викликів кожного AI-бекенду з одного процесу (див. gateway).
+AI_GATEWAY_LIMITS = getattr(settings, 'AI_GATEWAY_LIMITS', {'openapi': 100, 'gemini': 50})
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    pass
+
+
+# Після failure_threshold невдалих викликів поспіль запити одразу відхиляються на recovery_timeout секунд,
+# потім пропускається один пробний виклик: успіх закриває ланцюг, невдача знову відкриває.
+class CircuitBreaker:
+    def __init__(self, failure_threshold=OPENAPI_AI_FAILURE_THRESHOLD, recovery_timeout=OPENAPI_AI_RECOVERY_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.recovery_timeout:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.probing:
+                    logger.warning(f"OpenAPI AI circuit opened after {self.failures} consecutive failures.")
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
+class RetryingClient:
+    def __init__(self, max_retries=OPENAPI_AI_MAX_RETRIES, backoff_base=OPENAPI_AI_BACKOFF_BASE,
+                 backoff_max=OPENAPI_AI_BACKOFF_MAX, breaker=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+    # Експоненційна затримка з повним джитером: випадкове значення з [0, min(max, base * 2^attempt)].
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def check_circuit(self, url):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"OpenAPI AI circuit is open, call to {url} skipped.")
+
+    def retry_delay(self, attempt, error):
+        delay = self.backoff(attempt)
+        logger.warning(f"OpenAPI AI call failed ({error}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+
+# Одна сесія на процес: з'єднання з AI-бекендом перевикористовуються (keep-alive) замість нового TCP+TLS
+# рукостискання на кожен виклик. Повторюються лише помилки з'єднання та 5xx; тайм-аут читання не повторюється,
+# щоб воркер не чекав кілька повних тайм-аутів поспіль.
+class AIHttpClient(RetryingClient):
+    def __init__(self, pool_size=OPENAPI_AI_POOL_SIZE, timeout=(OPENAPI_AI_CONNECT_TIMEOUT, OPENAPI_AI_TIMEOUT),
+                 **retry_options):
+        super().__init__(**retry_options)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def post_json(self, url, payload):
+        self.check_circuit(url)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.exceptions.ConnectionError as e:
+                error = e
+            except requests.exceptions.RequestException:
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    response.raise_for_status()
+                    return response.json()
+                error = requests.exceptions.HTTPError(
+                    f"{response.status_code} Server Error from OpenAPI AI", response=response)
+
+            if attempt < self.max_retries:
+                time.sleep(self.retry_delay(attempt, error))
+
+        self.breaker.record_failure()
+        raise error
+
+    def close(self):
+        self.session.close()
+
+
+# Асинхронний варіант з тією ж політикою повторів. Під ASGI усі запити процесу обслуговує один цикл подій,
+# тож на процес створюється один httpx.AsyncClient - під час першого виклику, бо його з'єднання прив'язані
+# до циклу, в якому відкриті. Новий клієнт потрібен лише тоді, коли цей цикл закрито (asyncio.run у тестах).
+# Пул з'єднань дорівнює ліміту шлюзу, тож кожен виклик, що пройшов семафор, отримує власне з'єднання.
+class AsyncAIHttpClient(RetryingClient):
+    RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+    def __init__(self, max_connections=AI_GATEWAY_LIMITS['openapi'],
+                 timeout=httpx.Timeout(OPENAPI_AI_TIMEOUT, connect=OPENAPI_AI_CONNECT_TIMEOUT), transport=None,
+                 **retry_options):
+        super().__init__(**retry_options)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.timeout = timeout
+        self.transport = transport
+        self._client = None
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._client is None or self._loop.is_closed():
+                self._client = httpx.AsyncClient(headers={'Content-Type': 'application/json'}, limits=self.limits,
+                                                 timeout=self.timeout, transport=self.transport)
+                self._loop = loop
+            return self._client
+
+    async def post_json(self, url, payload):
+        self.check_circuit(url)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client().post(url, json=payload)
+            except self.RETRYABLE_ERRORS as e:
+                error = e
+            except httpx.HTTPError:
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    response.raise_for_status()
+                    return response.json()
+                error = httpx.HTTPStatusError(f"{response.status_code} Server Error from OpenAPI AI",
+                                              request=response.request, response=response)
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.retry_delay(attempt, error))
+
+        self.breaker.record_failure()
+        raise error
+
+    async def aclose(self):
+        with self._lock:
+            client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+
+ai_client = AIHttpClient()
+# Спільний з синхронним клієнтом запобіжник: обидва звертаються до того самого бекенду.
+async_ai_client = AsyncAIHttpClient(breaker=ai_client.breaker)
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+
+import google.generativeai as genai
+
+from src.openapi.client import AI_GATEWAY_LIMITS, async_ai_client
+
+logger = logging.getLogger(__name__)
+
+# Виклики понад ліміт чекають на семафорі в циклі подій, не займаючи потоку.
+# asyncio.Semaphore прив'язується до циклу, тож семафори створюються під час першого виклику в циклі
+# і зберігаються окремо для кожного (під ASGI цикл один на процес).
+class AIGateway:
+    def __init__(self, limits):
+        self.limits = limits
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def semaphore(self, backend):
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if backend not in semaphores:
+            semaphores[backend] = asyncio.Semaphore(self.limits[backend])
+        return semaphores[backend]
+
+    @asynccontextmanager
+    async def slot(self, backend):
+        semaphore = self.semaphore(backend)
+        if semaphore.locked():
+            logger.info(f"AI backend '{backend}' is at its concurrency limit ({self.limits[backend]}), waiting.")
+        async with semaphore:
+            yield
+
+    async def post_openapi(self, url, payload):
+        async with self.slot('openapi'):
+            return await async_ai_client.post_json(url, payload)
+
+    async def generate_gemini(self, model_name, prompt, **options):
+        async with self.slot('gemini'):
+            model = genai.GenerativeModel(model_name)
+            return await model.generate_content_async(prompt, **options)
+
+
+ai_gateway = AIGateway(AI_GATEWAY_LIMITS)
@@ -4,14 +4,14 @@ from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework.views import APIView
+from shared.async_views import AsyncAPIView
 
 from .serializers import OpenAPIChatRequestSerializer, OpenAPIChatResponseSerializer
-from ..service import call_openapi_ai
+from ..service import acall_openapi_ai
 
 logger = logging.getLogger(__name__)
 
-class OpenAPIChatView(APIView):
+class OpenAPIChatView(AsyncAPIView):
     permission_classes = [AllowAny] #[IsAuthenticated] для ограничения доступа
 
     @extend_schema(
@@ -45,7 +45,7 @@ class OpenAPIChatView(APIView):
             ),
         ]
     )
-    def post(self, request):
+    async def post(self, request):
         serializer = OpenAPIChatRequestSerializer(data=request.data)
         if not serializer.is_valid():
             logger.warning(f"Невірні дані отримано для OpenAPI чату: {serializer.errors}")
@@ -58,7 +58,7 @@ class OpenAPIChatView(APIView):
 
         logger.info(f"Викликаємо OpenAPI ШІ з повідомленнями: {messages[:100]}...")
         try:
-            ai_response_data = call_openapi_ai(messages=messages, model=model, chat_id=chat_id)
+            ai_response_data = await acall_openapi_ai(messages=messages, model=model, chat_id=chat_id)
 
             if not ai_response_data:
                 logger.error("OpenAPI ШІ сервіс повернув порожню відповідь.")
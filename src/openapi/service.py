@@ -1,15 +1,27 @@
+import httpx
 import requests
 from django.conf import settings
 import json
 import logging
 
+from src.openapi.client import OPENAPI_AI_TIMEOUT, CircuitOpenError, ai_client
+from src.openapi.gateway import ai_gateway
 from src.openapi.prompts import VACANCY_ANALYSIS_PROMPT
 from src.settings import OPENAPI_AI_URL
 
 logger = logging.getLogger(__name__)
 
 OPENAPI_AI_MODEL = getattr(settings, 'OPENAPI_AI_MODEL', 'qwen3-coder-plus')
-OPENAPI_AI_TIMEOUT = getattr(settings, 'OPENAPI_AI_TIMEOUT', 60)
+
+
+def _build_request(messages, model, chat_id, stream, temperature):
+    return {
+        "model": model or OPENAPI_AI_MODEL,
+        "messages": messages,
+        "chatId": chat_id,
+        "stream": stream,
+        "temperature": temperature
+    }
 
 
 def call_openapi_ai(messages: list, model: str = None, chat_id: str = "", stream: bool = False,
@@ -18,44 +30,65 @@ def call_openapi_ai(messages: list, model: str = None, chat_id: str = "", stream
         logger.error("OPENAPI_AI_URL не налаштовано в settings.")
         return {}
 
-    if model is None:
-        model = OPENAPI_AI_MODEL
-
-    headers = {'Content-Type': 'application/json'}
-
-    data = {
-        "model": model,
-        "messages": messages,
-        "chatId": chat_id,
-        "stream": stream,
-        "temperature": temperature
-    }
+    data = _build_request(messages, model, chat_id, stream, temperature)
+    model = data["model"]
 
     try:
         logger.debug(f"Calling OpenAPI AI at {OPENAPI_AI_URL} with model {model} and temperature {temperature}")
-        response = requests.post(OPENAPI_AI_URL, headers=headers, json=data, timeout=OPENAPI_AI_TIMEOUT)
-        response.raise_for_status()
-        ai_response = response.json()
+        ai_response = ai_client.post_json(OPENAPI_AI_URL, data)
         logger.info("OpenAPI AI call successful.")
         return ai_response
+    except CircuitOpenError as e:
+        logger.warning(str(e))
     except requests.exceptions.Timeout:
         logger.error(f"Timeout error calling OpenAPI AI (timeout={OPENAPI_AI_TIMEOUT}s)")
+    except json.JSONDecodeError as e:
+        logger.error(f"Error decoding JSON from OpenAPI AI response: {e}. Raw response text: {e.doc[:500]}")
     except requests.exceptions.RequestException as e:
         logger.error(f"Network error calling OpenAPI AI: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error in OpenAPI AI call: {e}", exc_info=True)
+    return {}
+
+
+# Асинхронний варіант call_openapi_ai: виклик проходить через ai_gateway з обмеженням одночасних запитів.
+async def acall_openapi_ai(messages: list, model: str = None, chat_id: str = "", stream: bool = False,
+                           temperature: float = 0.7) -> dict:
+    if not OPENAPI_AI_URL:
+        logger.error("OPENAPI_AI_URL не налаштовано в settings.")
+        return {}
+
+    data = _build_request(messages, model, chat_id, stream, temperature)
+
+    try:
+        logger.debug(f"Calling OpenAPI AI at {OPENAPI_AI_URL} with model {data['model']} and temperature {temperature}")
+        ai_response = await ai_gateway.post_openapi(OPENAPI_AI_URL, data)
+        logger.info("OpenAPI AI call successful.")
+        return ai_response
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+    except httpx.TimeoutException:
+        logger.error(f"Timeout error calling OpenAPI AI (timeout={OPENAPI_AI_TIMEOUT}s)")
     except json.JSONDecodeError as e:
-        logger.error(
-            f"Error decoding JSON from OpenAPI AI response: {e}. Raw response text: {response.text[:500] if 'response' in locals() else 'N/A'}")
+        logger.error(f"Error decoding JSON from OpenAPI AI response: {e}. Raw response text: {e.doc[:500]}")
+    except httpx.HTTPError as e:
+        logger.error(f"Network error calling OpenAPI AI: {e}")
     except Exception as e:
         logger.error(f"Unexpected error in OpenAPI AI call: {e}", exc_info=True)
     return {}
 
 
-def extract_vacancy_data(description_text: str) -> dict:
+def _vacancy_messages(description_text):
     prompt = VACANCY_ANALYSIS_PROMPT.format(vacancy_text=description_text)
+    return [{"role": "user", "content": prompt}]
+
+
+def extract_vacancy_data(description_text: str) -> dict:
+    raw_response = call_openapi_ai(messages=_vacancy_messages(description_text), temperature=0.1)
+    return _parse_vacancy_response(raw_response)
 
-    messages = [{"role": "user", "content": prompt}]
-    raw_response = call_openapi_ai(messages=messages, temperature=0.1)
 
+def _parse_vacancy_response(raw_response) -> dict:
     if not raw_response:
         logger.warning("OpenAPI AI returned no data for vacancy extraction.")
         return {}
@@ -0,0 +1,50 @@
+import asyncio
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase
+
+from openapi.client import AsyncAIHttpClient
+from openapi.gateway import AIGateway
+
+
+class AIGatewayTests(SimpleTestCase):
+    def test_concurrent_calls_are_capped_per_backend(self):
+        gateway = AIGateway({'openapi': 2, 'gemini': 1})
+        in_flight, peak = 0, 0
+
+        async def post_json(url, payload):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return payload
+
+        async def run():
+            return await asyncio.gather(*(gateway.post_openapi('http://ai', n) for n in range(6)))
+
+        with mock.patch('openapi.gateway.async_ai_client.post_json', post_json):
+            self.assertEqual(asyncio.run(run()), list(range(6)))
+        self.assertEqual(peak, 2)
+
+    def test_one_client_per_event_loop_lifetime(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={'ok': True}))
+        ai_client = AsyncAIHttpClient(max_connections=5, transport=transport)
+
+        async def run():
+            first = ai_client.client()
+            results = await asyncio.gather(*(ai_client.post_json('http://ai/', {}) for _ in range(3)))
+            self.assertIs(ai_client.client(), first)
+            return first, results
+
+        first, results = asyncio.run(run())
+        self.assertEqual(results, [{'ok': True}] * 3)
+
+        # Цикл попереднього asyncio.run закрито, тож його клієнт не перевикористовується.
+        async def second_loop():
+            client = ai_client.client()
+            await ai_client.aclose()
+            return client
+
+        self.assertIsNot(asyncio.run(second_loop()), first)
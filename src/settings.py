@@ -41,12 +41,14 @@ INSTALLED_APPS = [
     'vacancy',
     'matching',
     'openapi',
+    'jobs',
 
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'shared.db_routing.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -74,6 +76,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'src.wsgi.application'
+ASGI_APPLICATION = 'src.asgi.application'
 
 DATABASES = {
     'default': {
@@ -87,8 +90,65 @@ DATABASES = {
     }
 }
 
+# Необов'язкова репліка для читання: вмикається, якщо задано DB_REPLICA_HOST.
+# Не вказані параметри беруться з основної бази; у тестах репліка дзеркалить default.
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'OPTIONS': {'sslmode': os.getenv('DB_REPLICA_SSLMODE', DATABASES['default']['OPTIONS']['sslmode'])},
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['shared.db_routing.ReplicaRouter']
+
+# LocMemCache витісняє найдавніше використані записи після MAX_ENTRIES (LRU).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'matching': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'matching',
+        'TIMEOUT': int(os.getenv('MATCH_CACHE_TIMEOUT', '3600')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('MATCH_CACHE_MAX_ENTRIES', '5000')),
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    'cv_analysis': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cv_analysis',
+        'TIMEOUT': int(os.getenv('CV_ANALYSIS_MEMORY_CACHE_TIMEOUT', '86400')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CV_ANALYSIS_MEMORY_CACHE_MAX_ENTRIES', '500')),
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+# Найбільша кількість збігів у записі кешу 'matching' для відповіді без limit; довші списки не кешуються.
+MATCH_CACHE_MAX_ROWS = int(os.getenv('MATCH_CACHE_MAX_ROWS', '200'))
+
+# Скільки секунд результат аналізу CV зберігається в таблиці CVAnalysisResult.
+CV_ANALYSIS_CACHE_TTL = int(os.getenv('CV_ANALYSIS_CACHE_TTL', str(30 * 24 * 3600)))
+# Кожні стільки звернень до кешу аналізу CV процес пише в журнал зведення влучань і промахів; 0 вимикає.
+CV_ANALYSIS_CACHE_STATS_EVERY = int(os.getenv('CV_ANALYSIS_CACHE_STATS_EVERY', '100'))
+
 AUTH_USER_MODEL = 'users.User'
 
+# Рушій оцінювання для matching.materialize.rematch_cv: 'numpy' (у процесі) або 'sql' (у Postgres).
+MATCHING_BACKEND = os.getenv('MATCHING_BACKEND', 'numpy')
+
+# Обробка повторно надісланих текстів вакансій: reuse, reject або off (див. vacancy.dedup).
+VACANCY_DEDUP_MODE = os.getenv('VACANCY_DEDUP_MODE', 'reuse')
+
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '50'))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
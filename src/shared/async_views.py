@@ -0,0 +1,37 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+# APIView з асинхронним dispatch: обробники (async def post/get) виконуються в циклі подій, тож повільні
+# виклики ШІ не тримають потік воркера. Автентифікація, дозволи та тротлінг можуть звертатися до БД,
+# тому виконуються через sync_to_async. Декоратори на зразок ratelimit повертають корутину обробника,
+# яка очікується тут.
+class AsyncAPIView(APIView):
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
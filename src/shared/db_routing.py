@@ -0,0 +1,52 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = getattr(settings, 'REPLICA_DB_ALIAS', 'replica')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Псевдонім бази для читання в межах поточного запиту; None - основна база.
+# Поза HTTP-запитами (команди, воркери) значення завжди None, тож вони читають з основної бази.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def pin_to_primary():
+    _read_alias.set(None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        # Усередині транзакції читання мають бачити власні незафіксовані зміни.
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Після запису решта запиту читає з основної бази, щоб не отримати застарілі дані з репліки.
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        alias = REPLICA_DB_ALIAS if replica_configured() and request.method in SAFE_METHODS else None
+        token = _read_alias.set(alias)
+        try:
+            return self.get_response(request)
+        finally:
+            _read_alias.reset(token)
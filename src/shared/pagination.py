@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
+
+API_PAGE_SIZE = getattr(settings, 'API_PAGE_SIZE', 50)
+MAX_PAGE_SIZE = getattr(settings, 'MAX_PAGE_SIZE', 200)
+STREAM_CHUNK_SIZE = getattr(settings, 'STREAM_CHUNK_SIZE', 500)
+
+
+class KeysetCursorPagination(CursorPagination):
+    page_size = API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+
+class VacancyCursorPagination(KeysetCursorPagination):
+    ordering = ('-date', '-id')
+
+
+class CVCursorPagination(KeysetCursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class UserCursorPagination(KeysetCursorPagination):
+    ordering = ('-id',)
+
+
+# ?stream=1 віддає весь список одним JSON-масивом, який формується порціями з queryset.iterator(),
+# тож пам'ять не залежить від розміру таблиці.
+class StreamingListMixin:
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('stream') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).order_by(*self.pagination_class.ordering)
+        return StreamingHttpResponse(self._stream(queryset), content_type='application/json')
+
+    def _stream(self, queryset):
+        renderer = JSONRenderer()
+        yield b'['
+        for position, obj in enumerate(queryset.iterator(chunk_size=STREAM_CHUNK_SIZE)):
+            if position:
+                yield b','
+            yield renderer.render(self.get_serializer(obj).data)
+        yield b']'
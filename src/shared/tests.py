@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from matching.candidates import load_cv_feature_rows
+from matching.models import CVCatalogGeneration, VacancyCatalogGeneration
+from shared.db_routing import REPLICA_DB_ALIAS, ReplicaRoutingMiddleware, _read_alias
+from vacancy.index import VacancyIndex
+from vacancy.models import Vacancy
+
+
+def run_request(method, view):
+    request = RequestFactory().generic(method, '/')
+    return ReplicaRoutingMiddleware(view)(request)
+
+
+# TestCase загортає кожен тест у транзакцію, тож читання поза atomic-блоком імітується.
+def outside_transaction():
+    return mock.patch.object(connections[DEFAULT_DB_ALIAS], 'in_atomic_block', False)
+
+
+def read_alias(request):
+    with outside_transaction():
+        return router.db_for_read(Vacancy)
+
+
+# Рішення маршрутизатора перевіряються без другої бази: replica_configured підмінено, і жоден запит
+# на псевдонім репліки не виконується.
+@mock.patch('shared.db_routing.replica_configured', return_value=True)
+class ReplicaRouterTests(TestCase):
+    def test_safe_method_reads_go_to_replica(self, configured):
+        for method in ('GET', 'HEAD', 'OPTIONS'):
+            self.assertEqual(run_request(method, read_alias), REPLICA_DB_ALIAS)
+        self.assertEqual(run_request('POST', read_alias), DEFAULT_DB_ALIAS)
+
+    def test_write_pins_rest_of_request_to_primary(self, configured):
+        def view(request):
+            before = read_alias(request)
+            router.db_for_write(Vacancy)
+            return before, read_alias(request)
+
+        self.assertEqual(run_request('GET', view), (REPLICA_DB_ALIAS, DEFAULT_DB_ALIAS))
+
+    def test_atomic_blocks_read_from_primary(self, configured):
+        def view(request):
+            outside = read_alias(request)
+            with transaction.atomic():
+                return outside, router.db_for_read(Vacancy)
+
+        self.assertEqual(run_request('GET', view), (REPLICA_DB_ALIAS, DEFAULT_DB_ALIAS))
+
+    def test_context_is_reset_between_requests(self, configured):
+        def writing_view(request):
+            router.db_for_write(Vacancy)
+
+        run_request('GET', writing_view)
+        self.assertIsNone(_read_alias.get())
+        self.assertEqual(run_request('GET', read_alias), REPLICA_DB_ALIAS)
+        with self.assertRaises(RuntimeError):
+            run_request('GET', mock.Mock(side_effect=RuntimeError))
+        self.assertIsNone(_read_alias.get())
+
+
+# Те саме на справжніх з'єднаннях. Без DB_REPLICA_HOST псевдонім репліки додається як окреме з'єднання з тією ж
+# тестовою базою, тож запити рахуються окремо для кожного псевдоніма і другий сервер не потрібен.
+# Тест-раннер перевіряє databases ще до setUpClass, тому репліка додається туди лише після реєстрації псевдоніма.
+class ReplicaDatabaseTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if REPLICA_DB_ALIAS not in connections.settings:
+            connections.settings[REPLICA_DB_ALIAS] = {**connections[DEFAULT_DB_ALIAS].settings_dict}
+            cls.addClassCleanup(cls._remove_replica_alias)
+        cls.databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        cls.enterClassContext(mock.patch('shared.db_routing.replica_configured', return_value=True))
+        super().setUpClass()
+
+    @staticmethod
+    def _remove_replica_alias():
+        connections[REPLICA_DB_ALIAS].close()
+        del connections[REPLICA_DB_ALIAS]
+        del connections.settings[REPLICA_DB_ALIAS]
+
+    def _queries_by_alias(self, method, view):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary, \
+                CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica:
+            run_request(method, view)
+        return len(primary), len(replica)
+
+    def test_get_reads_from_replica_and_post_from_primary(self):
+        def view(request):
+            with outside_transaction():
+                list(Vacancy.objects.all())
+
+        self.assertEqual(self._queries_by_alias('GET', view), (0, 1))
+        self.assertEqual(self._queries_by_alias('POST', view), (1, 0))
+
+    def test_write_pins_reads_and_generation_to_primary(self):
+        def view(request):
+            with outside_transaction():
+                VacancyCatalogGeneration.current()
+                list(Vacancy.objects.all())
+            Vacancy.objects.create(title='Pinned')
+            with outside_transaction():
+                list(Vacancy.objects.all())
+
+        self.assertEqual(self._queries_by_alias('GET', view), (3, 1))
+
+    def test_catalog_reads_go_to_primary(self):
+        def view(request):
+            with outside_transaction():
+                VacancyCatalogGeneration.current()
+                CVCatalogGeneration.current()
+                VacancyIndex().rebuild()
+                load_cv_feature_rows()
+
+        primary, replica = self._queries_by_alias('GET', view)
+        self.assertGreaterEqual(primary, 4)
+        self.assertEqual(replica, 0)
@@ -14,6 +14,7 @@ urlpatterns = [
     path('api/language/', include('language.interfaces.urls')),
     path('api/vacancies/', include('vacancy.interfaces.urls')),
     path('api/matching/', include('matching.interfaces.urls')),
+    path('api/jobs/', include('jobs.interfaces.urls')),
 
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
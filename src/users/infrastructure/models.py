@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Upper
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
@@ -49,6 +50,11 @@ class User(AbstractUser):
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = []
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Upper('email'), name='user_email_upper_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -61,6 +67,11 @@ class PersonalInfo(models.Model):
     country = models.CharField(max_length=100, blank=True, null=True)
     city = models.CharField(max_length=100, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(Upper('email'), name='personalinfo_email_upper_idx'),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.desired_position})"
 
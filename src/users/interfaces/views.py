@@ -6,6 +6,7 @@ from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from shared.pagination import StreamingListMixin, UserCursorPagination
 from users.infrastructure.models import User
 from users.interfaces.serializers import (UserSerializer, RegisterSerializer, LoginSerializer, PatchUserSerializer)
 
@@ -31,9 +32,10 @@ def profile(request):
     }
     return JsonResponse(data)
 
-class UserListCreateView(generics.ListCreateAPIView):
+class UserListCreateView(StreamingListMixin, generics.ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = UserCursorPagination
 
     @extend_schema(
         responses={200: USER_LIST_RESPONSE},
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:51
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0006_remove_education_profile_remove_course_profile_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personalinfo',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='personalinfo_email_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='user_email_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+import hashlib
+import logging
+import re
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from vacancy.models import VacancyFingerprint
+
+logger = logging.getLogger(__name__)
+
+# 'reuse' - повторно використати видобуті дані дубліката, 'reject' - відхилити дублікат, 'off' - не перевіряти.
+VACANCY_DEDUP_MODE = getattr(settings, 'VACANCY_DEDUP_MODE', 'reuse')
+VACANCY_DEDUP_MODES = ('reuse', 'reject', 'off')
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+# 64 біти діляться на 4 смуги по 16: тексти з відстанню Хемінга <= 3 гарантовано мають спільну смугу.
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+MAX_HAMMING_DISTANCE = getattr(settings, 'VACANCY_DEDUP_MAX_DISTANCE', SIMHASH_BANDS - 1)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+
+def _shingles(words):
+    if len(words) <= SHINGLE_SIZE:
+        return [' '.join(words)]
+    return [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def _to_signed(value):
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+# Кожен шингл з трьох слів хешується в 64 біти; біт SimHash встановлюється, якщо він одиничний
+# у більшості шинглів. Схожі тексти дають хеші з малою відстанню Хемінга.
+def simhash(normalized_text):
+    shingles = _shingles(normalized_text.split())
+    digests = b''.join(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(shingles), SIMHASH_BITS)
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return _to_signed(int(''.join('1' if bit else '0' for bit in majority), 2))
+
+
+def simhash_bands(value):
+    unsigned = value & ((1 << SIMHASH_BITS) - 1)
+    mask = (1 << BAND_BITS) - 1
+    return [(band << BAND_BITS) | ((unsigned >> (band * BAND_BITS)) & mask) for band in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(left, right):
+    return ((left ^ right) & ((1 << SIMHASH_BITS) - 1)).bit_count()
+
+
+def fingerprint_text(vacancy_text):
+    normalized = normalize_text(vacancy_text)
+    value = simhash(normalized)
+    return VacancyFingerprint(
+        text_sha256=hashlib.sha256(normalized.encode('utf-8')).hexdigest(),
+        simhash=value,
+        simhash_bands=simhash_bands(value),
+    )
+
+
+# Спершу точний збіг за SHA-256, потім кандидати зі спільною смугою (GIN-індекс) з перевіркою відстані Хемінга.
+def find_duplicate(fingerprint):
+    exact = VacancyFingerprint.objects.filter(text_sha256=fingerprint.text_sha256).first()
+    if exact is not None:
+        return exact
+
+    candidates = VacancyFingerprint.objects.filter(simhash_bands__overlap=fingerprint.simhash_bands)
+    best, best_distance = None, MAX_HAMMING_DISTANCE + 1
+    for candidate in candidates.only('id', 'vacancy_id', 'simhash', 'extracted_data'):
+        distance = hamming_distance(candidate.simhash, fingerprint.simhash)
+        if distance < best_distance:
+            best, best_distance = candidate, distance
+    if best is not None:
+        logger.info(f"Знайдено майже дублікат вакансії (відбиток {best.id}, відстань Хемінга {best_distance}).")
+    return best
+
+
+def remember_fingerprint(fingerprint, vacancy, extracted_data):
+    fingerprint.vacancy = vacancy
+    fingerprint.extracted_data = extracted_data
+    try:
+        with transaction.atomic():
+            fingerprint.save()
+    except IntegrityError:
+        # Той самий текст паралельно зберіг інший запит.
+        logger.info(f"Відбиток {fingerprint.text_sha256[:12]} вже збережено.")
@@ -0,0 +1,145 @@
+import logging
+import threading
+from bisect import bisect_left, insort
+from heapq import merge
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from matching.features import normalize_terms
+from matching.models import VacancyCatalogGeneration
+from vacancy.models import Vacancy, VacancyIndexChange
+
+logger = logging.getLogger(__name__)
+
+# Більший список кандидатів не передається в запит як id IN (...): фільтр перетину навичок виконує
+# GIN-індекс vacancy_skills_normalized_gin.
+VACANCY_INDEX_MAX_IDS = getattr(settings, 'VACANCY_INDEX_MAX_IDS', 1000)
+# Скільки останніх поколінь зберігає журнал VacancyIndexChange. Індекс, що відстав більше, перебудовується.
+VACANCY_INDEX_CHANGE_RETENTION = getattr(settings, 'VACANCY_INDEX_CHANGE_RETENTION', 10000)
+
+
+def _union(postings):
+    result = []
+    for vacancy_id in merge(*postings):
+        if not result or result[-1] != vacancy_id:
+            result.append(vacancy_id)
+    return result
+
+
+# Збільшує VacancyCatalogGeneration і в тій самій транзакції записує зміну постингів для індексів інших процесів.
+# Давні записи журналу видаляються раз на сто поколінь.
+def record_vacancy_change(vacancy_id, skills_normalized, removed=False):
+    with transaction.atomic():
+        generation = VacancyCatalogGeneration.bump()
+        VacancyIndexChange.objects.create(generation=generation, vacancy_id=vacancy_id,
+                                          skills_normalized=list(skills_normalized or ()), removed=removed)
+        if generation % 100 == 0:
+            VacancyIndexChange.objects.filter(generation__lte=generation - VACANCY_INDEX_CHANGE_RETENTION).delete()
+    return generation
+
+
+def _add_posting(postings, skill, vacancy_id):
+    ids = postings.setdefault(skill, [])
+    position = bisect_left(ids, vacancy_id)
+    if position == len(ids) or ids[position] != vacancy_id:
+        ids.insert(position, vacancy_id)
+
+
+def _remove_posting(postings, skill, vacancy_id):
+    ids = postings.get(skill, [])
+    position = bisect_left(ids, vacancy_id)
+    if position < len(ids) and ids[position] == vacancy_id:
+        del ids[position]
+        if not ids:
+            del postings[skill]
+
+
+# Індекс будується в кожному процесі один раз, а далі доганяє VacancyCatalogGeneration за журналом
+# VacancyIndexChange: створення чи видалення вакансії в будь-якому процесі (веб або воркер черги) записує
+# зміну постингів під новим поколінням. Покоління без записів у журналі (наприклад, після rematch_all) навички
+# не змінюють. Застосування змін ідемпотентне, тож зміна, яку вже побачила перебудова, нічого не ламає.
+# Повна перебудова у фоновому потоці потрібна лише для ще не побудованого індексу або того, що відстав
+# більше, ніж зберігає журнал; запит тим часом фільтрується в БД.
+class VacancyIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._postings = {}
+        self._generation = None
+        self._rebuilding = False
+
+    def rebuild(self):
+        # Покоління читається до вакансій: зміну, що відбулася під час побудови, індекс потім застосує з журналу
+        # ще раз, і це безпечно. Вакансії, як і покоління, читаються з основної бази.
+        generation = VacancyCatalogGeneration.current()
+        postings = {}
+        rows = Vacancy.objects.using(DEFAULT_DB_ALIAS).order_by('id').values_list('id', 'skills_normalized')
+        for vacancy_id, skills in rows.iterator(chunk_size=2000):
+            for skill in skills or ():
+                postings.setdefault(skill, []).append(vacancy_id)
+        with self._lock:
+            self._postings = postings
+            self._generation = generation
+        logger.info(f"Інвертований індекс вакансій перебудовано (покоління {generation}): {len(postings)} навичок.")
+
+    def invalidate(self):
+        with self._lock:
+            self._postings = {}
+            self._generation = None
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                logger.error(f"Не вдалося перебудувати інвертований індекс вакансій: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+                connections.close_all()
+
+        threading.Thread(target=run, name='vacancy-index-rebuild', daemon=True).start()
+
+    # Застосовує зміни з журналу між поколінням індексу і generation. Перебудова, що завершилася тим часом,
+    # замінює постинги, тож зміни застосовуються лише до того стану, для якого їх прочитано.
+    def _catch_up(self, generation):
+        with self._replay_lock:
+            with self._lock:
+                since = self._generation
+            if since is None or since >= generation or generation - since > VACANCY_INDEX_CHANGE_RETENTION:
+                return
+            changes = VacancyIndexChange.objects.using(DEFAULT_DB_ALIAS).filter(
+                generation__gt=since, generation__lte=generation,
+            ).order_by('generation').values_list('vacancy_id', 'skills_normalized', 'removed')
+            changes = list(changes)
+            with self._lock:
+                if self._generation != since:
+                    return
+                for vacancy_id, skills, removed in changes:
+                    for skill in skills:
+                        if removed:
+                            _remove_posting(self._postings, skill, vacancy_id)
+                        else:
+                            _add_posting(self._postings, skill, vacancy_id)
+                self._generation = generation
+        logger.debug(f"Інвертований індекс вакансій оновлено до покоління {generation}: змін {len(changes)}.")
+
+    # Відсортовані ID вакансій зі спільною нормалізованою навичкою або None, якщо індекс ще не побудовано
+    # або його не вдалося догнати до поточного покоління каталогу.
+    def candidates(self, skills):
+        generation = VacancyCatalogGeneration.current()
+        self._catch_up(generation)
+        with self._lock:
+            if self._generation is not None and self._generation >= generation:
+                return _union([self._postings.get(s, []) for s in normalize_terms(skills)])
+        self._rebuild_in_background()
+        return None
+
+
+vacancy_index = VacancyIndex()
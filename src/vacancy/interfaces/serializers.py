@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from matching.features import MATCHING_SOURCE_FIELDS, vacancy_matching_features
 from vacancy.models import Vacancy, VacancyCategory, Country, City, Currency
 
 
@@ -110,6 +111,22 @@ class VacancySerializer(serializers.ModelSerializer):
 
         return data
 
+    def create(self, validated_data):
+        validated_data.update(vacancy_matching_features(validated_data))
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        source = {field: validated_data.get(field, getattr(instance, field)) for field in MATCHING_SOURCE_FIELDS}
+        validated_data.update(vacancy_matching_features(source))
+        return super().update(instance, validated_data)
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
         return data
+
+
+class VacancySearchResultSerializer(VacancySerializer):
+    rank = serializers.FloatField(read_only=True, help_text="Релевантність (ts_rank)")
+
+    class Meta(VacancySerializer.Meta):
+        fields = VacancySerializer.Meta.fields + ['rank']
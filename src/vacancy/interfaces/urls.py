@@ -1,9 +1,10 @@
 from django.urls import path
 from vacancy.interfaces.views import VacancyListCreateView
 
-from src.vacancy.interfaces.views import VacancyRetrieveDestroyView
+from src.vacancy.interfaces.views import VacancyRetrieveDestroyView, VacancySearchView
 
 urlpatterns = [
     path('', VacancyListCreateView.as_view(), name='vacancy-list-create'),
+    path('search/', VacancySearchView.as_view(), name='vacancy-search'),
     path('<int:pk>/', VacancyRetrieveDestroyView.as_view(), name='vacancy-detail'),
 ]
@@ -2,25 +2,36 @@ import logging
 
 from django.db.models import Q
 from drf_spectacular.utils import extend_schema
-from openapi.service import extract_vacancy_data
+from jobs.interfaces.serializers import JobAcceptedSerializer
+from jobs.interfaces.views import job_accepted_response
 from rest_framework import serializers
 from rest_framework import status, generics
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from shared.pagination import StreamingListMixin, VacancyCursorPagination
+from vacancy.dedup import VACANCY_DEDUP_MODE, VACANCY_DEDUP_MODES, find_duplicate, fingerprint_text
+from vacancy.index import record_vacancy_change
 from vacancy.models import Vacancy
+from vacancy.search import search_vacancies
+from vacancy.tasks import enqueue_vacancy_creation
 
 from src.schemas.vacancy import (VACANCY_LIST_RESPONSE, VACANCY_DETAIL_RESPONSE, VACANCY_DELETE_RESPONSE)
-from src.vacancy.interfaces.serializers import VacancySerializer
+from src.vacancy.interfaces.serializers import VacancySearchResultSerializer, VacancySerializer
 
 
 class CreateVacancyRequestSerializer(serializers.Serializer):
     vacancy_text = serializers.CharField(required=True, help_text="Сирий текст вакансії для обробки ШІ.")
+    on_duplicate = serializers.ChoiceField(
+        choices=VACANCY_DEDUP_MODES, default=VACANCY_DEDUP_MODE,
+        help_text="Що робити з (майже) дублікатом уже обробленого тексту: reuse - використати збережені дані "
+                  "без виклику ШІ, reject - відхилити з кодом 409, off - не перевіряти.")
 
 
-class VacancyListCreateView(generics.ListCreateAPIView):
+class VacancyListCreateView(StreamingListMixin, generics.ListCreateAPIView):
     queryset = Vacancy.objects.all()
     serializer_class = VacancySerializer
+    pagination_class = VacancyCursorPagination
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -35,11 +46,13 @@ class VacancyListCreateView(generics.ListCreateAPIView):
 
     @extend_schema(
         summary="Створити нову вакансію з необробленого тексту",
-        description="Приймає сирий текст вакансії, обробляє його ШІ для видобування структурованих даних, нормалізує дані та зберігає вакансію.",
+        description="Приймає сирий текст вакансії та ставить у чергу завдання, яке обробляє його ШІ, нормалізує дані "
+                    "та зберігає вакансію. Стан і створену вакансію (поле result) повертає status_url.",
         request=CreateVacancyRequestSerializer,
         responses={
-            201: VACANCY_DETAIL_RESPONSE,
+            202: JobAcceptedSerializer,
             400: "Помилка в запиті або даних вакансії",
+            409: "Текст є дублікатом уже обробленої вакансії (on_duplicate=reject)",
             500: "Помилка сервера під час обробки тексту або взаємодії з ШІ",
             503: "Сервіс ШІ недоступний"
         }
@@ -58,31 +71,19 @@ class VacancyListCreateView(generics.ListCreateAPIView):
             logger.warning("Не надано тексту вакансії у запиті.")
             return Response({'error': 'Текст вакансії є обов\'язковим.'}, status=status.HTTP_400_BAD_REQUEST)
 
+        on_duplicate = serializer.validated_data.get('on_duplicate')
+
         try:
-            logger.info("Відправка тексту вакансії до ШІ для обробки.")
-            ai_extracted_data = extract_vacancy_data(description_text=vacancy_text)
-
-            if not ai_extracted_data:
-                logger.error("ШІ не повернув дані для вакансії.")
-                return Response({'error': 'Не вдалося отримати структуровані дані від ШІ.'},
-                                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            logger.debug(f"Дані, отримані від ШІ: {ai_extracted_data}")
-
-            vacancy_serializer = VacancySerializer(data=ai_extracted_data)
-
-            if vacancy_serializer.is_valid():
-                vacancy = vacancy_serializer.save()
-                logger.info(f"Вакансія '{vacancy.title}' (ID: {vacancy.id}) успішно створена з обробленого тексту.")
-                return Response(vacancy_serializer.data, status=status.HTTP_201_CREATED)
-            else:
-                logger.warning(f"Дані від ШІ не пройшли валідацію: {vacancy_serializer.errors}")
-                return Response(
-                    {
-                        'error': 'Дані, отримані від ШІ, не відповідають формату вакансії. Можливо, текст був нерозпізнаний.',
-                        'details': vacancy_serializer.errors},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            # Відхилення дубліката не потребує ШІ, тож виконується одразу; решта - у фоновому завданні.
+            if on_duplicate == 'reject':
+                duplicate = find_duplicate(fingerprint_text(vacancy_text))
+                if duplicate is not None:
+                    logger.info(f"Текст вакансії відхилено як дублікат вакансії {duplicate.vacancy_id}.")
+                    return Response({'error': 'Ця вакансія вже була оброблена.', 'vacancy_id': duplicate.vacancy_id},
+                                    status=status.HTTP_409_CONFLICT)
+
+            job = enqueue_vacancy_creation(vacancy_text, on_duplicate)
+            return job_accepted_response(request, job)
 
         except Exception as e:
             logger.error(f"Несподівана помилка під час створення вакансії: {e}", exc_info=True)
@@ -111,6 +112,49 @@ class VacancyRetrieveDestroyView(generics.RetrieveDestroyAPIView):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        vacancy_id, skills = instance.id, instance.skills_normalized
+        super().perform_destroy(instance)
+        record_vacancy_change(vacancy_id, skills, removed=True)
+
+
+class VacancySearchView(APIView):
+    permission_classes = [AllowAny]
+
+    MAX_LIMIT = 200
+    DEFAULT_LIMIT = 20
+
+    @extend_schema(
+        summary="Повнотекстовий пошук вакансій",
+        description="Шукає за назвою, навичками та описом, результати впорядковано за ts_rank. "
+                    "Параметри: q (обов'язковий), category, city, is_remote, limit.",
+        responses={200: VacancySearchResultSerializer(many=True)},
+    )
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({'error': "Параметр q є обов'язковим."}, status=status.HTTP_400_BAD_REQUEST)
+
+        is_remote = request.query_params.get('is_remote')
+        if is_remote not in (None, '', 'true', 'false'):
+            return Response({'error': 'Параметр is_remote має бути true або false.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit') or self.DEFAULT_LIMIT)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.MAX_LIMIT:
+            return Response({'error': f'Параметр limit має бути від 1 до {self.MAX_LIMIT}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        vacancies = search_vacancies(
+            text,
+            category=request.query_params.get('category'),
+            city=request.query_params.get('city'),
+            is_remote=None if not is_remote else is_remote == 'true',
+        )[:limit]
+        return Response(VacancySearchResultSerializer(vacancies, many=True).data)
+
 
 class VacancyListView(APIView):
     permission_classes = [IsAuthenticated]
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from matching.features import MATCHING_FEATURE_FIELDS, apply_matching_features
+from vacancy.models import Vacancy
+
+
+class Command(BaseCommand):
+    help = "Перераховує нормалізовані ознаки підбору (навички, локації, зарплата, рівень) для наявних вакансій."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Кількість вакансій в одному bulk_update.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        updated = 0
+
+        for vacancy in Vacancy.objects.order_by('id').iterator(chunk_size=batch_size):
+            batch.append(apply_matching_features(vacancy))
+            if len(batch) >= batch_size:
+                Vacancy.objects.bulk_update(batch, MATCHING_FEATURE_FIELDS)
+                updated += len(batch)
+                batch = []
+                self.stdout.write(f"Оновлено {updated} вакансій...")
+
+        if batch:
+            Vacancy.objects.bulk_update(batch, MATCHING_FEATURE_FIELDS)
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Ознаки підбору оновлено для {updated} вакансій."))
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:37
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+# Знімок matching.features на момент міграції: подальші зміни модуля не повинні змінювати того,
+# що робить ця міграція. Діапазон зарплати заповнює 0018.
+LEVEL_HIERARCHY = ['intern', 'junior', 'middle', 'senior', 'lead', 'director']
+LEVEL_RANKS = {level: rank for rank, level in enumerate(LEVEL_HIERARCHY)}
+FEATURE_FIELDS = ['skills_normalized', 'cities_normalized', 'countries_normalized', 'level_normalized', 'level_rank']
+
+
+def normalize_terms(values):
+    return sorted(set(v.lower().strip() for v in (values or []) if v))
+
+
+# Без заповнення фільтр 6 (перетин skills_normalized) та інвертований індекс пропускали б усі наявні вакансії.
+def fill_matching_features(apps, schema_editor):
+    Vacancy = apps.get_model('vacancy', 'Vacancy')
+    batch = []
+    vacancies = Vacancy.objects.only('skills', 'cities', 'countries', 'level')
+    for vacancy in vacancies.iterator(chunk_size=500):
+        vacancy.skills_normalized = normalize_terms(vacancy.skills)
+        vacancy.cities_normalized = normalize_terms(vacancy.cities)
+        vacancy.countries_normalized = normalize_terms(vacancy.countries)
+        vacancy.level_normalized = vacancy.level.lower().strip() if vacancy.level else None
+        vacancy.level_rank = LEVEL_RANKS.get(vacancy.level_normalized)
+        batch.append(vacancy)
+        if len(batch) >= 500:
+            Vacancy.objects.bulk_update(batch, FEATURE_FIELDS)
+            batch = []
+    if batch:
+        Vacancy.objects.bulk_update(batch, FEATURE_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0016_alter_vacancy_description'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='cities_normalized',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), blank=True, default=list, size=None, verbose_name='Міста (нормалізовані)'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='countries_normalized',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), blank=True, default=list, size=None, verbose_name='Країни (нормалізовані)'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='level_normalized',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='Рівень кандидата (нормалізований)'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='level_rank',
+            field=models.SmallIntegerField(blank=True, null=True, verbose_name='Порядковий номер рівня'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='skills_normalized',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, size=None, verbose_name='Навички (нормалізовані)'),
+        ),
+        migrations.RunPython(fill_matching_features, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:44
+
+from decimal import Decimal
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations
+from django.db.backends.postgresql.psycopg_any import NumericRange
+
+# Знімок matching.salary.EXCHANGE_RATES та matching.features.salary_base_range на момент міграції:
+# подальші зміни цих модулів не повинні змінювати того, що робить ця міграція.
+EXCHANGE_RATES = {
+    'USD': 1.0,
+    'EUR': 0.92,
+    'UAH': 41.0,
+}
+
+
+def salary_base_range(salary_min, salary_max, currency):
+    rate = EXCHANGE_RATES.get(currency.upper()) if currency else None
+    if salary_min is None and salary_max is None or not rate:
+        return None
+    lower = Decimal(salary_min) / Decimal(rate) if salary_min else None
+    upper = Decimal(salary_max) / Decimal(rate) if salary_max else None
+    if lower is not None and upper is not None and lower > upper:
+        return NumericRange(empty=True)
+    return NumericRange(lower, upper, '[]')
+
+
+def fill_salary_range(apps, schema_editor):
+    Vacancy = apps.get_model('vacancy', 'Vacancy')
+    batch = []
+    vacancies = Vacancy.objects.filter(salary_currency__isnull=False).only('salary_min', 'salary_max', 'salary_currency')
+    for vacancy in vacancies.iterator(chunk_size=500):
+        vacancy.salary_range_base = salary_base_range(vacancy.salary_min, vacancy.salary_max, vacancy.salary_currency)
+        batch.append(vacancy)
+        if len(batch) >= 500:
+            Vacancy.objects.bulk_update(batch, ['salary_range_base'])
+            batch = []
+    if batch:
+        Vacancy.objects.bulk_update(batch, ['salary_range_base'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0017_vacancy_matching_features'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='salary_range_base',
+            field=django.contrib.postgres.fields.ranges.DecimalRangeField(blank=True, null=True, verbose_name='Діапазон зарплати в базовій валюті'),
+        ),
+        migrations.RunPython(fill_salary_range, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['salary_range_base'], name='vacancy_salary_range_gist'),
+        ),
+    ]
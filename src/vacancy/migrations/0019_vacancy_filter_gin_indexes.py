@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:46
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0018_vacancy_salary_range'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['categories'], name='vacancy_categories_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['cities'], name='vacancy_cities_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['countries'], name='vacancy_countries_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['languages'], name='vacancy_languages_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
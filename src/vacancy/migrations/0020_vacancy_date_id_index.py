@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0019_vacancy_filter_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['-date', '-id'], name='vacancy_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    CREATE OR REPLACE FUNCTION vacancy_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(array_to_string(NEW.skills, ' '), '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER vacancy_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, skills, description ON vacancy_vacancy
+        FOR EACH ROW EXECUTE FUNCTION vacancy_search_vector_update();
+
+    UPDATE vacancy_vacancy SET title = title;
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+    DROP TRIGGER IF EXISTS vacancy_search_vector_trigger ON vacancy_vacancy;
+    DROP FUNCTION IF EXISTS vacancy_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0020_vacancy_date_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True, verbose_name='Пошуковий вектор'),
+        ),
+        migrations.RunSQL(sql=SEARCH_VECTOR_SQL, reverse_sql=DROP_SEARCH_VECTOR_SQL),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='vacancy_search_vector_gin'),
+        ),
+    ]
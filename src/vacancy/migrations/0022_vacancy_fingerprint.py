@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:58
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0021_vacancy_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256 нормалізованого тексту')),
+                ('simhash', models.BigIntegerField(verbose_name='64-бітний SimHash тексту')),
+                ('simhash_bands', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), size=None, verbose_name='Смуги SimHash для LSH-пошуку')),
+                ('extracted_data', models.JSONField(verbose_name='Структуровані дані, видобуті ШІ')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('vacancy', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fingerprints', to='vacancy.vacancy', verbose_name='Вакансія')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['simhash_bands'], name='vacancy_fp_bands_gin')],
+            },
+        ),
+    ]
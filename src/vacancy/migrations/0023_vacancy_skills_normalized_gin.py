@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:22
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0022_vacancy_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skills_normalized'], name='vacancy_skills_normalized_gin'),
+        ),
+    ]
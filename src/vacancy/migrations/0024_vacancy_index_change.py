@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:36
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0023_vacancy_skills_normalized_gin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyIndexChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.BigIntegerField(unique=True, verbose_name='Покоління каталогу після зміни')),
+                ('vacancy_id', models.BigIntegerField(verbose_name='ID вакансії')),
+                ('skills_normalized', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, size=None, verbose_name='Нормалізовані навички вакансії')),
+                ('removed', models.BooleanField(default=False, verbose_name='Вакансію видалено')),
+            ],
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
-from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.fields import ArrayField, DecimalRangeField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVectorField
 
 
 class VacancyCategory(models.TextChoices):
@@ -114,6 +116,16 @@ class EnglishLevel(models.TextChoices):
 class Vacancy(models.Model):
     class Meta:
         app_label = 'vacancy'
+        indexes = [
+            GinIndex(fields=['categories'], name='vacancy_categories_gin'),
+            GinIndex(fields=['cities'], name='vacancy_cities_gin'),
+            GinIndex(fields=['countries'], name='vacancy_countries_gin'),
+            GinIndex(fields=['languages'], opclasses=['jsonb_path_ops'], name='vacancy_languages_gin'),
+            GistIndex(fields=['salary_range_base'], name='vacancy_salary_range_gist'),
+            models.Index(fields=['-date', '-id'], name='vacancy_date_id_idx'),
+            GinIndex(fields=['search_vector'], name='vacancy_search_vector_gin'),
+            GinIndex(fields=['skills_normalized'], name='vacancy_skills_normalized_gin'),
+        ]
 
     title = models.CharField(max_length=255, verbose_name="Назва вакансії")
     link = models.URLField(blank=True, null=True, verbose_name="Посилання на вакансію")
@@ -133,6 +145,21 @@ class Vacancy(models.Model):
                                        verbose_name="Валюта зарплати")
     date = models.DateTimeField(auto_now_add=True, verbose_name="Дата додавання")
 
+    # Нормалізовані ознаки для підбору, заповнюються VacancySerializer; наявні вакансії - міграціями 0017-0018
+    skills_normalized = ArrayField(models.CharField(max_length=100), blank=True, default=list,
+                                   verbose_name="Навички (нормалізовані)")
+    cities_normalized = ArrayField(models.CharField(max_length=50), blank=True, default=list,
+                                   verbose_name="Міста (нормалізовані)")
+    countries_normalized = ArrayField(models.CharField(max_length=50), blank=True, default=list,
+                                      verbose_name="Країни (нормалізовані)")
+    salary_range_base = DecimalRangeField(blank=True, null=True, verbose_name="Діапазон зарплати в базовій валюті")
+    level_normalized = models.CharField(max_length=50, blank=True, null=True,
+                                        verbose_name="Рівень кандидата (нормалізований)")
+    level_rank = models.SmallIntegerField(blank=True, null=True, verbose_name="Порядковий номер рівня")
+
+    # Заповнюється тригером vacancy_search_vector_trigger (див. міграцію 0021) з title, skills та description
+    search_vector = SearchVectorField(blank=True, null=True, editable=False, verbose_name="Пошуковий вектор")
+
     def __str__(self):
         return self.title
 
@@ -144,3 +171,40 @@ class Vacancy(models.Model):
         if self.cities:
             parts.extend([City(c).label for c in self.cities])
         return ", ".join(parts) if parts else "Не вказано"
+
+
+# Відбиток сирого тексту вакансії, за яким ШІ вже видобув структуровані дані (див. vacancy.dedup).
+class VacancyFingerprint(models.Model):
+    class Meta:
+        app_label = 'vacancy'
+        indexes = [
+            GinIndex(fields=['simhash_bands'], name='vacancy_fp_bands_gin'),
+        ]
+
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='fingerprints', verbose_name="Вакансія")
+    text_sha256 = models.CharField(max_length=64, unique=True, verbose_name="SHA-256 нормалізованого тексту")
+    simhash = models.BigIntegerField(verbose_name="64-бітний SimHash тексту")
+    simhash_bands = ArrayField(models.BigIntegerField(), verbose_name="Смуги SimHash для LSH-пошуку")
+    extracted_data = models.JSONField(verbose_name="Структуровані дані, видобуті ШІ")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.text_sha256
+
+
+# Журнал змін інвертованого індексу навичок (див. vacancy.index): кожне створення чи видалення вакансії
+# записує рядок із поколінням VacancyCatalogGeneration, до якого воно призвело, і процеси доганяють свій індекс
+# цими змінами замість повної перебудови.
+class VacancyIndexChange(models.Model):
+    class Meta:
+        app_label = 'vacancy'
+
+    generation = models.BigIntegerField(unique=True, verbose_name="Покоління каталогу після зміни")
+    vacancy_id = models.BigIntegerField(verbose_name="ID вакансії")
+    skills_normalized = ArrayField(models.CharField(max_length=100), default=list, blank=True,
+                                   verbose_name="Нормалізовані навички вакансії")
+    removed = models.BooleanField(default=False, verbose_name="Вакансію видалено")
+
+    def __str__(self):
+        return f"{'-' if self.removed else '+'}{self.vacancy_id} @ {self.generation}"
@@ -0,0 +1,19 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+from vacancy.models import Vacancy
+
+# Має збігатися з конфігурацією в тригері vacancy_search_vector_update (міграція 0021).
+VACANCY_SEARCH_CONFIG = 'simple'
+
+
+def search_vacancies(text, category=None, city=None, is_remote=None):
+    query = SearchQuery(text, config=VACANCY_SEARCH_CONFIG, search_type='websearch')
+    vacancies = Vacancy.objects.filter(search_vector=query)
+    if category:
+        vacancies = vacancies.filter(categories__contains=[category])
+    if city:
+        vacancies = vacancies.filter(cities__overlap=[city])
+    if is_remote is not None:
+        vacancies = vacancies.filter(is_remote=is_remote)
+    return vacancies.annotate(rank=SearchRank(F('search_vector'), query)).order_by('-rank', '-id')
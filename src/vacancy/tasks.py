@@ -0,0 +1,57 @@
+import logging
+
+from jobs.service import PermanentJobError, enqueue, job_handler
+from matching.materialize import rematch_vacancy
+from openapi.service import extract_vacancy_data
+from vacancy.dedup import VACANCY_DEDUP_MODE, find_duplicate, fingerprint_text, remember_fingerprint
+from vacancy.index import record_vacancy_change
+
+from src.vacancy.interfaces.serializers import VacancySerializer
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler('vacancy.create_from_text')
+def create_vacancy_from_text(vacancy_text, on_duplicate=VACANCY_DEDUP_MODE):
+    fingerprint = duplicate = None
+    if on_duplicate != 'off':
+        fingerprint = fingerprint_text(vacancy_text)
+        duplicate = find_duplicate(fingerprint)
+
+    if duplicate is not None and on_duplicate == 'reject':
+        raise PermanentJobError(f"Ця вакансія вже була оброблена (вакансія {duplicate.vacancy_id}).")
+
+    if duplicate is not None:
+        logger.info(f"Використовуються збережені дані ШІ дубліката (вакансія {duplicate.vacancy_id}).")
+        ai_extracted_data = duplicate.extracted_data
+    else:
+        logger.info("Відправка тексту вакансії до ШІ для обробки.")
+        ai_extracted_data = extract_vacancy_data(description_text=vacancy_text)
+
+    if not ai_extracted_data:
+        # Порожня відповідь ШІ зазвичай тимчасова, тож завдання буде повторено.
+        raise RuntimeError("Не вдалося отримати структуровані дані від ШІ.")
+
+    logger.debug(f"Дані, отримані від ШІ: {ai_extracted_data}")
+
+    vacancy_serializer = VacancySerializer(data=ai_extracted_data)
+    if not vacancy_serializer.is_valid():
+        logger.warning(f"Дані від ШІ не пройшли валідацію: {vacancy_serializer.errors}")
+        raise PermanentJobError(
+            f"Дані, отримані від ШІ, не відповідають формату вакансії. Можливо, текст був нерозпізнаний. "
+            f"Деталі: {vacancy_serializer.errors}")
+
+    vacancy = vacancy_serializer.save()
+    if fingerprint is not None and duplicate is None:
+        remember_fingerprint(fingerprint, vacancy, ai_extracted_data)
+    try:
+        rematch_vacancy(vacancy)
+    except Exception as e:
+        logger.error(f"Не вдалося оновити збіги для вакансії {vacancy.id}: {e}", exc_info=True)
+    record_vacancy_change(vacancy.id, vacancy.skills_normalized)
+    logger.info(f"Вакансія '{vacancy.title}' (ID: {vacancy.id}) успішно створена з обробленого тексту.")
+    return vacancy_serializer.data
+
+
+def enqueue_vacancy_creation(vacancy_text, on_duplicate):
+    return enqueue('vacancy.create_from_text', {'vacancy_text': vacancy_text, 'on_duplicate': on_duplicate})
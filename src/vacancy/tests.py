@@ -0,0 +1,133 @@
+from unittest import mock
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+
+from matching.features import vacancy_matching_features
+from matching.models import VacancyCatalogGeneration
+from vacancy.index import VacancyIndex, record_vacancy_change, vacancy_index
+from vacancy.models import Vacancy
+from vacancy.services import filter_vacancies
+
+
+def create_vacancy(**fields):
+    fields.setdefault('title', 'Vacancy')
+    fields.setdefault('categories', ['IT'])
+    return Vacancy.objects.create(**fields, **vacancy_matching_features(fields))
+
+
+def cv_features(**fields):
+    defaults = {'skills': [], 'languages': [], 'level': None, 'categories': ['IT'], 'countries': [], 'cities': [],
+                'is_remote': None, 'willing_to_relocate': None,
+                'salary_min': None, 'salary_max': None, 'salary_currency': ''}
+    return {**defaults, **fields}
+
+
+@mock.patch.object(VacancyIndex, '_rebuild_in_background')
+class VacancyIndexTests(TestCase):
+    def setUp(self):
+        self.python = create_vacancy(skills=['Python', 'Django'])
+        self.go = create_vacancy(skills=[' go '])
+        self.index = VacancyIndex()
+
+    def test_stale_index_schedules_rebuild_instead_of_answering(self, rebuild_in_background):
+        self.assertIsNone(self.index.candidates(['python']))
+        rebuild_in_background.assert_called_once_with()
+
+    def test_index_catches_up_from_change_log(self, rebuild_in_background):
+        self.index.rebuild()
+        self.assertEqual(self.index.candidates(['PYTHON', 'Go']), [self.python.id, self.go.id])
+        self.assertEqual(self.index.candidates(['rust']), [])
+
+        rust = create_vacancy(skills=['Rust', 'Python'])
+        record_vacancy_change(rust.id, rust.skills_normalized)
+        python_id, python_skills = self.python.id, self.python.skills_normalized
+        self.python.delete()
+        record_vacancy_change(python_id, python_skills, removed=True)
+        # Покоління без запису в журналі (rematch_all) навичок не змінює.
+        VacancyCatalogGeneration.bump()
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.index.candidates(['python', 'rust']), [rust.id])
+        self.assertEqual(self.index.candidates(['django']), [])
+        rebuild_in_background.assert_not_called()
+
+    def test_replayed_change_already_seen_by_rebuild_is_ignored(self, rebuild_in_background):
+        rust = create_vacancy(skills=['Rust'])
+        generation = record_vacancy_change(rust.id, rust.skills_normalized)
+        self.index.rebuild()
+        # Перебудова могла прочитати покоління до зміни, а вакансії - після неї.
+        self.index._generation = generation - 1
+        self.assertEqual(self.index.candidates(['rust']), [rust.id])
+        rebuild_in_background.assert_not_called()
+
+    def test_index_behind_change_log_retention_is_rebuilt(self, rebuild_in_background):
+        self.index.rebuild()
+        for skills in (['Rust'], ['Scala']):
+            vacancy = create_vacancy(skills=skills)
+            record_vacancy_change(vacancy.id, vacancy.skills_normalized)
+        with mock.patch('vacancy.index.VACANCY_INDEX_CHANGE_RETENTION', 1):
+            self.assertIsNone(self.index.candidates(['rust']))
+        rebuild_in_background.assert_called_once_with()
+
+
+@mock.patch.object(VacancyIndex, '_rebuild_in_background')
+class SkillFilterTests(TestCase):
+    def setUp(self):
+        self.matching = [create_vacancy(skills=['Python']), create_vacancy(skills=['SQL', 'python'])]
+        create_vacancy(skills=['Rust'])
+        create_vacancy(skills=['Python'], categories=['Design'])
+        self.cv = cv_features(skills=['Python', 'Docker'])
+        self.expected = {v.id for v in self.matching}
+        vacancy_index.invalidate()
+
+    def _filtered_ids(self):
+        return set(filter_vacancies(self.cv).values_list('id', flat=True))
+
+    def test_stale_index_falls_back_to_gin_filter(self, rebuild_in_background):
+        self.assertEqual(self._filtered_ids(), self.expected)
+        rebuild_in_background.assert_called()
+
+    def test_index_candidates_are_used_when_current(self, rebuild_in_background):
+        vacancy_index.rebuild()
+        queryset = filter_vacancies(self.cv)
+        self.assertIn(' IN (', str(queryset.query))
+        self.assertEqual(set(queryset.values_list('id', flat=True)), self.expected)
+        rebuild_in_background.assert_not_called()
+
+    def test_large_candidate_set_uses_gin_filter(self, rebuild_in_background):
+        vacancy_index.rebuild()
+        with mock.patch('vacancy.services.VACANCY_INDEX_MAX_IDS', 1):
+            queryset = filter_vacancies(self.cv)
+            self.assertIn('&&', str(queryset.query))
+            self.assertNotIn(' IN (', str(queryset.query))
+            self.assertEqual(set(queryset.values_list('id', flat=True)), self.expected)
+
+    def test_cv_without_skills_gets_nothing(self, rebuild_in_background):
+        self.cv['skills'] = []
+        self.assertEqual(self._filtered_ids(), set())
+
+
+# Фільтри filter_vacancies мають іти через GIN-індекси; enable_seqscan=off прибирає вибір на користь
+# послідовного сканування, який планувальник робить для крихітної тестової таблиці.
+class FilterIndexTests(TestCase):
+    def setUp(self):
+        for n in range(20):
+            create_vacancy(categories=['IT', f'C{n}'], skills=['Python', f's{n}'],
+                           languages=[{'language': 'English', 'level': 'B2'}])
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, condition, index_name):
+        plan = Vacancy.objects.filter(condition).only('id').explain()
+        self.assertIn(index_name, plan)
+
+    def test_category_filter_uses_gin_index(self):
+        self.assertUsesIndex(Q(categories__overlap=['IT']), 'vacancy_categories_gin')
+
+    def test_language_filter_uses_gin_index(self):
+        self.assertUsesIndex(Q(languages__contains=[{'language': 'English', 'level': 'B2'}]), 'vacancy_languages_gin')
+
+    def test_skill_filter_uses_gin_index(self):
+        self.assertUsesIndex(Q(skills_normalized__overlap=['python']), 'vacancy_skills_normalized_gin')